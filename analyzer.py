@@ -1,3 +1,4 @@
+import time
 from dataclasses import dataclass
 from typing import List
 
@@ -10,20 +11,25 @@ class TradeRecord:
 class PerformanceAnalyzer:
     def __init__(self):
         self.trades: List[TradeRecord] = []
+        # Running aggregates so get_summary() doesn't re-scan every trade
+        self._total_pnl = 0.0
+        self._wins = 0
 
     def log_trade(self, pnl: float, strategy: str):
-        import time
         self.trades.append(TradeRecord(time.time(), pnl, strategy))
+        self._total_pnl += pnl
+        if pnl > 0:
+            self._wins += 1
 
     def get_summary(self):
         if not self.trades:
             return "No trades executed."
-        
-        total_pnl = sum(t.pnl for t in self.trades)
-        wins = len([t for t in self.trades if t.pnl > 0])
+
+        total_pnl = self._total_pnl
+        wins = self._wins
         total = len(self.trades)
         win_rate = (wins / total) * 100 if total > 0 else 0
-        
+
         return {
             "Total PnL": total_pnl,
             "Total Trades": total,
@@ -3,27 +3,167 @@ Flask API Server for Arbitrage Bot Dashboard
 Exposes real-time bot data via REST endpoints
 """
 
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 import sqlite3
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 import json
+import functools
+import logging
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("APIServer")
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React dashboard
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'arbitrage_bot.db')
-LOG_PATH = os.path.join(os.path.dirname(__file__), f'bot_log_{datetime.now().strftime("%Y%m%d")}.log')
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+
+# Single pass over each log line: one C-level regex search instead of several substring/split checks
+LOG_PAT = re.compile(
+    r'(?P<ws>WebSocket feeds active)'
+    r'|(?P<am>ACTIVE MARKET SET:\s*(?P<market>.+?)\s*$)'
+    r'|(?P<mp>Found\s+(?P<n>\d+)\s+matched pairs)'
+    r'|(?P<mf>MATCH FOUND[^:]*:\s*(?P<kalshi>.*?)\s*<->\s*(?P<poly>.+?)\s*$)'
+)
+
+# Asset tag of a matched pair from its ticker/title text (one case-insensitive scan; SOL otherwise)
+ASSET_PAT = re.compile(r'BTC|ETH', re.I)
+
+# get_status scan flags
+STATUS_WS, STATUS_MARKET, STATUS_PAIRS = 1, 2, 4
+STATUS_ALL = STATUS_WS | STATUS_MARKET | STATUS_PAIRS
+
+# /api/opportunities and /api/trades are columnar: {"columns": [...], "rows": [[...], ...]}
+# (one list of values per row instead of a dict per row; see fromColumns() in dashboard/src/App.jsx)
+OPPORTUNITY_COLUMNS = [
+    'id', 'timestamp', 'kalshi_ticker', 'poly_ticker', 'title', 'profit', 'decision', 'reason',
+    'strategy', 'type', 'kalshi_yes', 'kalshi_no', 'poly_yes', 'poly_no',
+    'volume_total', 'volume_kalshi', 'volume_polymarket', 'contracts'
+]
+TRADE_COLUMNS = [
+    'id', 'contracts', 'kalshi_cost', 'poly_cost', 'total_cost', 'expected_profit',
+    'strategy', 'kalshi_ticker', 'poly_ticker', 'executed_at'
+]
+
+# Levels shown in the dashboard log panel
+DASHBOARD_LOG_LEVELS = frozenset({'INFO', 'WARNING', 'ERROR'})
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config(mtime: float) -> dict:
+    """Parse config.json. Cached by mtime so the file is only re-read when it changes."""
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_config() -> dict:
+    """Get bot config (cached until config.json is modified)"""
+    try:
+        mtime = os.path.getmtime(CONFIG_PATH)
+    except OSError:
+        return {}
+    return _load_config(mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _log_path(day: date) -> str:
+    """Bot log for a given day (matches logger.py naming). Resolved per day so the server follows log rotation."""
+    return os.path.join(os.path.dirname(__file__), f'bot_log_{day:%Y%m%d}.log')
+
+
+def _tail(path: str, n: int, block_size: int = 8192) -> list:
+    """
+    Return the last n lines of a file without reading the whole file.
+    Seeks to EOF and reads fixed-size blocks backwards until n newlines are seen.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buffer = b''
+        while pos > 0 and buffer.count(b'\n') <= n:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            buffer = f.read(read_size) + buffer
+
+    lines = buffer.splitlines()[-n:]
+    return [line.decode('utf-8', errors='ignore') for line in lines]
+
+
+def ojson(obj):
+    """JSON response encoded with orjson (C encoder, emits bytes directly). Falls back to jsonify."""
+    if orjson is None:
+        return jsonify(obj)
+    return Response(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), mimetype='application/json')
+
+
+def _intern(value):
+    """Intern small-vocabulary strings (decision/strategy/type) so repeated rows share one object"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Per-connection setup, sent as one script
+CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-65536;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;  -- 256 MiB: read hot pages via the OS page cache
+"""
+
+_tls = threading.local()
 
 
 def get_db_connection():
-    """Get SQLite database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Get SQLite database connection.
+    One connection per worker thread, reused across requests so SQLite's page cache stays warm.
+    """
+    conn = getattr(_tls, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(CONNECTION_PRAGMAS)
+        _tls.conn = conn
     return conn
 
 
+# Indexes for the dashboard sort/filter queries, keyed by table.
+# trades / arbitrage_opportunities are not created by DatabaseManager, so missing tables are skipped.
+# The opportunities indexes (idx_opp_ts, idx_opp_pair_ts) are defined once, in DatabaseManager._create_schema.
+DASHBOARD_INDEXES = {
+    'trades': ["CREATE INDEX IF NOT EXISTS idx_trades_exec ON trades(executed_at DESC);"],
+    'arbitrage_opportunities': ["CREATE INDEX IF NOT EXISTS idx_arb_detected ON arbitrage_opportunities(detected_at);"],
+}
+
+
+def ensure_indexes():
+    """Create dashboard indexes for tables that exist, in a single executescript call"""
+    conn = get_db_connection()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    script = "\n".join(
+        stmt
+        for table, stmts in DASHBOARD_INDEXES.items() if table in tables
+        for stmt in stmts
+    )
+    if script:
+        conn.executescript(script)
+
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get current bot status"""
@@ -34,43 +174,43 @@ def get_status():
         active_market = None
         monitored_pairs = 0
 
-        if os.path.exists(LOG_PATH):
-            with open(LOG_PATH, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()[-100:]
-
-                for line in reversed(lines):
-                    # Check for active WebSocket
-                    if 'WebSocket feeds active' in line:
-                        status = "active"
-                        break
-                    if 'ACTIVE MARKET SET' in line:
-                        parts = line.split('ACTIVE MARKET SET:')
-                        if len(parts) > 1:
-                            active_market = parts[1].strip()
-                    if 'Found' in line and 'matched pairs' in line:
-                        try:
-                            parts = line.split('Found')[1].split('matched pairs')
-                            monitored_pairs = int(parts[0].strip())
-                        except:
-                            pass
-
-                # Get timestamp of last log entry
-                if lines:
-                    try:
-                        last_line = lines[-1]
-                        timestamp_str = last_line.split(' - ')[0]
-                        last_update = timestamp_str
-                    except:
-                        pass
+        log_path = _log_path(date.today())
+        if os.path.exists(log_path):
+            lines = _tail(log_path, 100)
+
+            # Newest line wins for each field; stop as soon as all three have been seen
+            found = 0
+            for line in reversed(lines):
+                m = LOG_PAT.search(line)
+                if not m:
+                    continue
+                kind = m.lastgroup
+                # Check for active WebSocket
+                if kind == 'ws' and not found & STATUS_WS:
+                    status = "active"
+                    found |= STATUS_WS
+                elif kind == 'am' and not found & STATUS_MARKET:
+                    active_market = m.group('market')
+                    found |= STATUS_MARKET
+                elif kind == 'mp' and not found & STATUS_PAIRS:
+                    monitored_pairs = int(m.group('n'))
+                    found |= STATUS_PAIRS
+                if found == STATUS_ALL:
+                    break
+
+            # Get timestamp of last log entry
+            if lines:
+                try:
+                    last_line = lines[-1]
+                    timestamp_str = last_line.split(' - ')[0]
+                    last_update = timestamp_str
+                except:
+                    pass
 
         # Get config
-        config = {}
-        config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+        config = get_config()
 
-        return jsonify({
+        return ojson({
             'status': status,
             'last_update': last_update,
             'active_market': active_market,
@@ -79,7 +219,7 @@ def get_status():
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
 
 
 @app.route('/api/markets', methods=['GET'])
@@ -88,33 +228,26 @@ def get_markets():
     try:
         markets = []
 
-        # Parse log for market info
-        if os.path.exists(LOG_PATH):
-            with open(LOG_PATH, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()[-500:]
-
-                for line in lines:
-                    if 'MATCH FOUND' in line:
-                        try:
-                            # Extract market info
-                            parts = line.split('MATCH FOUND')
-                            if len(parts) > 1:
-                                info = parts[1].strip()
-                                # Parse format: "(BTC 15m heuristic): KXBTC... <-> btc-updown..."
-                                if '<->' in info:
-                                    market_parts = info.split('<->')
-                                    kalshi = market_parts[0].split(':')[1].strip() if ':' in market_parts[0] else ''
-                                    poly = market_parts[1].strip()
-                                    asset = 'BTC' if 'BTC' in info else ('ETH' if 'ETH' in info else 'SOL')
-
-                                    markets.append({
-                                        'asset': asset,
-                                        'kalshi_ticker': kalshi,
-                                        'poly_ticker': poly,
-                                        'status': 'monitoring'
-                                    })
-                        except:
-                            pass
+        # Parse log for market info: MATCH FOUND lines are written for every pair discovery locks
+        # (matched_markets only gets rows after a trade, so it isn't the monitored set)
+        log_path = _log_path(date.today())
+        if os.path.exists(log_path):
+            lines = _tail(log_path, 500)
+
+            for line in lines:
+                m = LOG_PAT.search(line)
+                if not m or m.lastgroup != 'mf':
+                    continue
+                # Parse format: "MATCH FOUND (BTC 15m heuristic): KXBTC... <-> btc-updown..."
+                a = ASSET_PAT.search(m.group('mf'))
+                asset = a.group().upper() if a else 'SOL'
+
+                markets.append({
+                    'asset': asset,
+                    'kalshi_ticker': m.group('kalshi'),
+                    'poly_ticker': m.group('poly'),
+                    'status': 'monitoring'
+                })
 
         # Remove duplicates
         unique_markets = []
@@ -125,12 +258,12 @@ def get_markets():
                 seen.add(key)
                 unique_markets.append(m)
 
-        return jsonify({
+        return ojson({
             'markets': list(reversed(unique_markets))[:10],  # Last 10 unique markets
             'count': len(unique_markets)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
 
 
 @app.route('/api/opportunities', methods=['GET'])
@@ -138,11 +271,7 @@ def get_opportunities():
     """Get detected arbitrage opportunities (including rejected ones)"""
     try:
         # Get config to check simulation mode
-        config = {}
-        config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+        config = get_config()
 
         simulation_mode = config.get('SIMULATION_MODE', True)
 
@@ -153,18 +282,22 @@ def get_opportunities():
         SELECT
             o.id,
             o.timestamp,
-            o.price_kalshi_yes,
-            o.price_kalshi_no,
-            o.price_poly_yes,
-            o.price_poly_no,
+            IFNULL(o.price_kalshi_yes, 0.0) AS price_kalshi_yes,
+            IFNULL(o.price_kalshi_no, 0.0) AS price_kalshi_no,
+            IFNULL(o.price_poly_yes, 0.0) AS price_poly_yes,
+            IFNULL(o.price_poly_no, 0.0) AS price_poly_no,
             o.cost_a,
             o.cost_b,
-            o.net_profit_best,
+            IFNULL(o.net_profit_best, 0.0) AS net_profit_best,
             o.decision,
             o.reason,
-            o.details_json,
-            mm.kalshi_ticker,
-            mm.poly_ticker,
+            -- json_extract raises on malformed JSON (e.g. NaN written by older json.dumps), failing the
+            -- whole query; json_valid turns a bad row into NULL -> defaults instead
+            COALESCE(json_extract(CASE WHEN json_valid(o.details_json) THEN o.details_json END, '$.size'), 0) AS size,
+            COALESCE(json_extract(CASE WHEN json_valid(o.details_json) THEN o.details_json END, '$.buy_side'), 'N/A') AS buy_side,
+            COALESCE(json_extract(CASE WHEN json_valid(o.details_json) THEN o.details_json END, '$.type'), 'HARD') AS type,
+            COALESCE(NULLIF(mm.kalshi_ticker, ''), json_extract(CASE WHEN json_valid(o.details_json) THEN o.details_json END, '$.kalshi_ticker'), 'N/A') AS kalshi_ticker,
+            COALESCE(NULLIF(mm.poly_ticker, ''), json_extract(CASE WHEN json_valid(o.details_json) THEN o.details_json END, '$.poly_ticker'), 'N/A') AS poly_ticker,
             mm.title
         FROM opportunities o
         LEFT JOIN matched_markets mm ON o.market_pair_id = mm.id
@@ -173,27 +306,19 @@ def get_opportunities():
         """
 
         opportunities = conn.execute(query).fetchall()
-        conn.close()
 
-        result = []
+        rows = []
         for opp in opportunities:
-            # Parse details JSON
-            details = {}
-            if opp['details_json']:
-                try:
-                    details = json.loads(opp['details_json'])
-                except:
-                    pass
-
-            # Calculate volumes (contracts = size from details)
-            size = details.get('size', 0)
-            kalshi_yes = float(opp['price_kalshi_yes']) if opp['price_kalshi_yes'] else 0
-            kalshi_no = float(opp['price_kalshi_no']) if opp['price_kalshi_no'] else 0
-            poly_yes = float(opp['price_poly_yes']) if opp['price_poly_yes'] else 0
-            poly_no = float(opp['price_poly_no']) if opp['price_poly_no'] else 0
+            # Calculate volumes (contracts = size from details, extracted by SQLite JSON1)
+            size = opp['size']
+            # NULL prices are coerced to 0.0 in SQL
+            kalshi_yes = opp['price_kalshi_yes']
+            kalshi_no = opp['price_kalshi_no']
+            poly_yes = opp['price_poly_yes']
+            poly_no = opp['price_poly_no']
 
             # Calculate required volumes based on strategy
-            buy_side = details.get('buy_side', 'N/A')
+            buy_side = opp['buy_side']
             if buy_side == 'YES_K_NO_P':
                 kalshi_volume = size * kalshi_yes
                 poly_volume = size * poly_no
@@ -203,38 +328,36 @@ def get_opportunities():
 
             total_volume = kalshi_volume + poly_volume
 
-            result.append({
-                'id': opp['id'],
-                'timestamp': opp['timestamp'],
-                'kalshi_ticker': opp['kalshi_ticker'] if opp['kalshi_ticker'] else details.get('kalshi_ticker', 'N/A'),
-                'poly_ticker': opp['poly_ticker'] if opp['poly_ticker'] else details.get('poly_ticker', 'N/A'),
-                'title': opp['title'],
-                'profit': float(opp['net_profit_best']) if opp['net_profit_best'] else 0,
-                'decision': opp['decision'],
-                'reason': opp['reason'],
-                'strategy': buy_side,
-                'type': details.get('type', 'HARD'),
-                'simulated': simulation_mode,  # Add simulated flag based on config
-                'prices': {
-                    'kalshi_yes': kalshi_yes,
-                    'kalshi_no': kalshi_no,
-                    'poly_yes': poly_yes,
-                    'poly_no': poly_no
-                },
-                'volumes': {
-                    'total': total_volume,
-                    'kalshi': kalshi_volume,
-                    'polymarket': poly_volume,
-                    'contracts': size
-                }
-            })
-
-        return jsonify({
-            'opportunities': result,
-            'count': len(result)
+            # Order must match OPPORTUNITY_COLUMNS
+            rows.append((
+                opp['id'],
+                opp['timestamp'],
+                opp['kalshi_ticker'],
+                opp['poly_ticker'],
+                opp['title'],
+                opp['net_profit_best'],
+                _intern(opp['decision']),
+                opp['reason'],
+                _intern(buy_side),
+                _intern(opp['type']),
+                kalshi_yes,
+                kalshi_no,
+                poly_yes,
+                poly_no,
+                total_volume,
+                kalshi_volume,
+                poly_volume,
+                size
+            ))
+
+        return ojson({
+            'columns': OPPORTUNITY_COLUMNS,
+            'rows': rows,
+            'simulated': simulation_mode,  # Simulated flag based on config (applies to every row)
+            'count': len(rows)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
 
 
 @app.route('/api/trades', methods=['GET'])
@@ -247,14 +370,14 @@ def get_trades():
         query = """
         SELECT
             t.trade_id,
-            t.contracts,
-            t.k_cost,
-            t.p_cost,
-            t.total_cost,
+            IFNULL(t.contracts, 0.0) AS contracts,
+            IFNULL(t.k_cost, 0.0) AS k_cost,
+            IFNULL(t.p_cost, 0.0) AS p_cost,
+            IFNULL(t.total_cost, 0.0) AS total_cost,
             t.executed_at,
             mp.k_ticker,
             mp.p_ticker,
-            ao.profit_potential,
+            IFNULL(ao.profit_potential, 0.0) AS profit_potential,
             ao.buy_side
         FROM trades t
         LEFT JOIN market_pairs mp ON t.pair_id = mp.pair_id
@@ -264,29 +387,30 @@ def get_trades():
         """
 
         trades = conn.execute(query).fetchall()
-        conn.close()
 
-        result = []
+        rows = []
         for trade in trades:
-            result.append({
-                'id': trade['trade_id'],
-                'contracts': float(trade['contracts']) if trade['contracts'] else 0,
-                'kalshi_cost': float(trade['k_cost']) if trade['k_cost'] else 0,
-                'poly_cost': float(trade['p_cost']) if trade['p_cost'] else 0,
-                'total_cost': float(trade['total_cost']) if trade['total_cost'] else 0,
-                'expected_profit': float(trade['profit_potential']) if trade['profit_potential'] else 0,
-                'strategy': trade['buy_side'],
-                'kalshi_ticker': trade['k_ticker'],
-                'poly_ticker': trade['p_ticker'],
-                'executed_at': trade['executed_at']
-            })
-
-        return jsonify({
-            'trades': result,
-            'count': len(result)
+            # Order must match TRADE_COLUMNS (NULL numerics are coerced to 0.0 in SQL)
+            rows.append((
+                trade['trade_id'],
+                trade['contracts'],
+                trade['k_cost'],
+                trade['p_cost'],
+                trade['total_cost'],
+                trade['profit_potential'],
+                _intern(trade['buy_side']),
+                trade['k_ticker'],
+                trade['p_ticker'],
+                trade['executed_at']
+            ))
+
+        return ojson({
+            'columns': TRADE_COLUMNS,
+            'rows': rows,
+            'count': len(rows)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
 
 
 @app.route('/api/stats', methods=['GET'])
@@ -295,37 +419,37 @@ def get_stats():
     try:
         conn = get_db_connection()
 
-        # Get trade statistics
+        # Trade statistics + 24h opportunity statistics in a single round-trip
         stats_query = """
         SELECT
-            COUNT(*) as total_trades,
-            SUM(total_cost) as total_invested,
-            AVG(total_cost) as avg_trade_size
-        FROM trades
+            t.total_trades,
+            t.total_invested,
+            t.avg_trade_size,
+            o.total_opportunities,
+            o.avg_profit_potential
+        FROM
+            (SELECT
+                COUNT(*) as total_trades,
+                SUM(total_cost) as total_invested,
+                AVG(total_cost) as avg_trade_size
+             FROM trades) t,
+            (SELECT
+                COUNT(*) as total_opportunities,
+                AVG(profit_potential) as avg_profit_potential
+             FROM arbitrage_opportunities
+             WHERE detected_at > datetime('now', '-24 hours')) o
         """
         stats = conn.execute(stats_query).fetchone()
 
-        # Get opportunities count
-        opp_query = """
-        SELECT
-            COUNT(*) as total_opportunities,
-            AVG(profit_potential) as avg_profit_potential
-        FROM arbitrage_opportunities
-        WHERE detected_at > datetime('now', '-24 hours')
-        """
-        opp_stats = conn.execute(opp_query).fetchone()
-
-        conn.close()
-
-        return jsonify({
+        return ojson({
             'total_trades': stats['total_trades'] or 0,
             'total_invested': float(stats['total_invested']) if stats['total_invested'] else 0.0,
             'avg_trade_size': float(stats['avg_trade_size']) if stats['avg_trade_size'] else 0.0,
-            'opportunities_24h': opp_stats['total_opportunities'] or 0,
-            'avg_profit_potential': float(opp_stats['avg_profit_potential']) if opp_stats['avg_profit_potential'] else 0.0
+            'opportunities_24h': stats['total_opportunities'] or 0,
+            'avg_profit_potential': float(stats['avg_profit_potential']) if stats['avg_profit_potential'] else 0.0
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
 
 
 @app.route('/api/logs', methods=['GET'])
@@ -334,101 +458,163 @@ def get_logs():
     try:
         logs = []
 
-        if os.path.exists(LOG_PATH):
-            with open(LOG_PATH, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()[-100:]
-
-                for line in lines:
-                    # Parse log line
-                    try:
-                        parts = line.split(' - ')
-                        if len(parts) >= 4:
-                            timestamp = parts[0]
-                            level = parts[1].strip('[]')
-                            module = parts[2]
-                            message = ' - '.join(parts[3:]).strip()
-
-                            # Only include INFO, WARNING, ERROR
-                            if level in ['INFO', 'WARNING', 'ERROR']:
-                                logs.append({
-                                    'timestamp': timestamp,
-                                    'level': level,
-                                    'module': module,
-                                    'message': message
-                                })
-                    except:
-                        pass
-
-        return jsonify({
+        log_path = _log_path(date.today())
+        if os.path.exists(log_path):
+            lines = _tail(log_path, 100)
+
+            for line in lines:
+                # Parse log line: "timestamp - [LEVEL] - module - message" (message may contain ' - ')
+                parts = line.split(' - ', 3)
+                if len(parts) == 4:
+                    timestamp, level, module, message = parts
+                    level = level.strip('[]')
+
+                    # Only include INFO, WARNING, ERROR
+                    if level in DASHBOARD_LOG_LEVELS:
+                        logs.append({
+                            'timestamp': timestamp,
+                            'level': level,
+                            'module': module,
+                            'message': message.strip()
+                        })
+
+        return ojson({
             'logs': logs[-50:],  # Last 50 logs
             'count': len(logs)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
+
+
+# /api/all-markets cache: refreshed in the background so requests never wait on exchange APIs
+ALL_MARKETS_REFRESH_SECONDS = 30
+ALL_MARKETS_STALE_SECONDS = 3 * ALL_MARKETS_REFRESH_SECONDS  # Older than this: refresh inline
+_mkt_cache = {'ts': 0, 'data': None}
+_mkt_lock = threading.Lock()
+_mkt_refresher = None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_feeds():
+    """Create exchange feeds once (Kalshi key loading is not free)"""
+    from dotenv import load_dotenv
+    from market_data import KalshiFeed, PolymarketFeed
+
+    load_dotenv()
+
+    kalshi = KalshiFeed(
+        key=os.getenv('KALSHI_API_KEY'),
+        secret=os.getenv('KALSHI_API_SECRET')
+    )
+
+    poly = PolymarketFeed(
+        api_key=os.getenv('POLYMARKET_API_KEY'),
+        private_key=os.getenv('POLYMARKET_PRIVATE_KEY')
+    )
+    return kalshi, poly
+
+
+def _fetch_all_markets() -> dict:
+    """Fetch BTC markets from both platforms (concurrently) in dashboard format"""
+    kalshi, poly = _get_feeds()
+
+    # Fetch BTC markets from both platforms
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        kalshi_future = pool.submit(kalshi.fetch_events, series_ticker="KXBTC15M", status='active')
+        poly_future = pool.submit(poly.fetch_events, tag_id=102467, status='active', validate_tokens=False)
+        kalshi_btc = kalshi_future.result()
+        poly_all = poly_future.result()
+
+    # Filter Polymarket for BTC only
+    poly_btc = [m for m in poly_all if 'btc' in m.ticker.lower()]
+
+    # Convert to JSON-serializable format
+    kalshi_markets = []
+    for m in kalshi_btc:
+        kalshi_markets.append({
+            'ticker': m.ticker,
+            'title': m.title,
+            'close_time': m.resolution_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            'close_timestamp': int(m.resolution_time.timestamp()),
+            'yes_price': m.yes_price,
+            'no_price': m.no_price,
+            'volume': m.volume
+        })
+
+    poly_markets = []
+    for m in poly_btc:
+        poly_markets.append({
+            'ticker': m.ticker,
+            'title': m.title,
+            'close_time': m.resolution_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            'close_timestamp': int(m.resolution_time.timestamp()),
+            'yes_price': m.yes_price,
+            'no_price': m.no_price,
+            'volume': m.volume,
+            'metadata': m.metadata
+        })
+
+    return {
+        'kalshi': kalshi_markets,
+        'polymarket': poly_markets,
+        'kalshi_count': len(kalshi_markets),
+        'poly_count': len(poly_markets),
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def _refresh_all_markets():
+    data = _fetch_all_markets()
+    _mkt_cache['data'] = data
+    _mkt_cache['ts'] = time.time()
+
+
+def _refresh_loop():
+    """Background refresh of the /api/all-markets cache"""
+    while True:
+        time.sleep(ALL_MARKETS_REFRESH_SECONDS)
+        try:
+            _refresh_all_markets()
+        except Exception as e:
+            logger.error(f"[all-markets] Background refresh failed: {e}")
+
+
+def _ensure_market_refresher():
+    """Start the background refresh thread on first use"""
+    global _mkt_refresher
+    with _mkt_lock:
+        if _mkt_refresher is None or not _mkt_refresher.is_alive():
+            _mkt_refresher = threading.Thread(target=_refresh_loop, daemon=True)
+            _mkt_refresher.start()
 
 
 @app.route('/api/all-markets', methods=['GET'])
 def get_all_markets():
-    """Get ALL markets from both platforms for manual pairing"""
+    """Get ALL markets from both platforms for manual pairing (served from background-refreshed cache)"""
     try:
-        from dotenv import load_dotenv
-        from market_data import KalshiFeed, PolymarketFeed
-
-        load_dotenv()
-
-        # Initialize feeds
-        kalshi = KalshiFeed(
-            key=os.getenv('KALSHI_API_KEY'),
-            secret=os.getenv('KALSHI_API_SECRET')
-        )
-
-        poly = PolymarketFeed(
-            api_key=os.getenv('POLYMARKET_API_KEY'),
-            private_key=os.getenv('POLYMARKET_PRIVATE_KEY')
-        )
-
-        # Fetch BTC markets from both platforms
-        kalshi_btc = kalshi.fetch_events(series_ticker="KXBTC15M", status='active')
-        poly_all = poly.fetch_events(tag_id=102467, status='active', validate_tokens=False)
-
-        # Filter Polymarket for BTC only
-        poly_btc = [m for m in poly_all if 'btc' in m.ticker.lower()]
-
-        # Convert to JSON-serializable format
-        kalshi_markets = []
-        for m in kalshi_btc:
-            kalshi_markets.append({
-                'ticker': m.ticker,
-                'title': m.title,
-                'close_time': m.resolution_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                'close_timestamp': int(m.resolution_time.timestamp()),
-                'yes_price': m.yes_price,
-                'no_price': m.no_price,
-                'volume': m.volume
-            })
-
-        poly_markets = []
-        for m in poly_btc:
-            poly_markets.append({
-                'ticker': m.ticker,
-                'title': m.title,
-                'close_time': m.resolution_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                'close_timestamp': int(m.resolution_time.timestamp()),
-                'yes_price': m.yes_price,
-                'no_price': m.no_price,
-                'volume': m.volume,
-                'metadata': m.metadata
-            })
-
-        return jsonify({
-            'kalshi': kalshi_markets,
-            'polymarket': poly_markets,
-            'kalshi_count': len(kalshi_markets),
-            'poly_count': len(poly_markets),
-            'timestamp': datetime.now().isoformat()
+        _ensure_market_refresher()
+
+        # Inline fetch when nothing is cached yet (first request) or background refreshes keep failing.
+        # Under the lock and re-checked, so concurrent requests trigger one exchange fetch, not one each
+        if _mkt_cache['data'] is None or time.time() - _mkt_cache['ts'] > ALL_MARKETS_STALE_SECONDS:
+            with _mkt_lock:
+                if _mkt_cache['data'] is None:
+                    _refresh_all_markets()
+                elif time.time() - _mkt_cache['ts'] > ALL_MARKETS_STALE_SECONDS:
+                    # Serve the old snapshot flagged as stale if the exchanges are still failing
+                    try:
+                        _refresh_all_markets()
+                    except Exception as e:
+                        logger.warning(f"[all-markets] Inline refresh failed, serving stale cache: {e}")
+
+        age = time.time() - _mkt_cache['ts']
+        return ojson({
+            **_mkt_cache['data'],
+            'cache_age_seconds': round(age, 1),
+            'stale': age > ALL_MARKETS_STALE_SECONDS
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}), 500
 
 
 if __name__ == '__main__':
@@ -442,4 +628,15 @@ if __name__ == '__main__':
     print("   - GET /api/stats")
     print("   - GET /api/logs")
     print("   - GET /api/all-markets  (NEW: Manual pairing)")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    ensure_indexes()
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if serve:
+        # Production WSGI server: parallel handlers, each with its own thread-local DB connection
+        serve(app, host='0.0.0.0', port=5000, threads=8)
+    else:
+        print("waitress not installed - falling back to Flask threaded server (pip install waitress)")
+        app.run(host='0.0.0.0', port=5000, threaded=True)
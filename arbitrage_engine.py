@@ -1,10 +1,13 @@
+from array import array
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List
 from market_data import MarketEvent
+from database_manager import HardArbRecord
 from logger import logger
 import time
 
-@dataclass
+@dataclass(slots=True)
 class ArbitrageOpportunity:
     type: str # 'HARD', 'PROB', 'LAG'
     event_kalshi: MarketEvent
@@ -17,207 +20,376 @@ class ArbitrageOpportunity:
     poly_token_yes: Optional[str] = None
     poly_token_no: Optional[str] = None
 
+def _hard_arb_net(k_yes: float, k_no: float, p_yes: float, p_no: float,
+                  fee_kalshi: float, fee_poly: float) -> Tuple[float, float, float, float]:
+    """
+    Pure hard-arb arithmetic shared by the single-pair and batch paths.
+    Fees: Poly fixed per unit, Kalshi % of leg value.
+    Returns (net_profit_a, net_profit_b, fees_a, fees_b). A = P_YES + K_NO, B = P_NO + K_YES.
+    """
+    fees_a = fee_poly + k_no * fee_kalshi
+    fees_b = fee_poly + k_yes * fee_kalshi
+    return 1.0 - (p_yes + k_no) - fees_a, 1.0 - (p_no + k_yes) - fees_b, fees_a, fees_b
+
+def _scan_hard(k_yes: List[float], k_no: List[float], p_yes: List[float], p_no: List[float],
+               fee_kalshi: float, fee_poly: float, min_profit: float) -> List[int]:
+    """
+    Batch kernel for hard arbitrage: same math as check_hard_arbitrage, over parallel price arrays.
+    Scenario A = P_YES + K_NO, B = P_NO + K_YES.
+    Returns the indices of the pairs whose best scenario clears min_profit.
+    """
+    hits: List[int] = []
+    for i, (ky, kn, py, pn) in enumerate(zip(k_yes, k_no, p_yes, p_no)):
+        net_a, net_b, _, _ = _hard_arb_net(ky, kn, py, pn, fee_kalshi, fee_poly)
+        if net_a > min_profit or net_b > min_profit:  # best = max(net_a, net_b)
+            hits.append(i)
+    return hits
+
 class ArbitrageDetector:
     """
     Scans for arbitrage opportunities between matched events.
     """
     
     
-    def __init__(self, fee_kalshi: float = 0.02, fee_poly: float = 0.0, min_profit: float = 0.01, db_manager = None):
+    def __init__(self, fee_kalshi: float = 0.02, fee_poly: float = 0.0, min_profit: float = 0.01, db_manager = None,
+                 log_misses: bool = False, miss_flush_interval: float = 60.0):
         self.fee_kalshi = fee_kalshi # Simplified fee model
         self.fee_poly = fee_poly
         self.min_profit = min_profit
         self.db_manager = db_manager
 
+        # Misses (NO BUY) are counted per pair and flushed periodically instead of one DB row per tick.
+        # log_misses=True restores the full per-tick opportunity rows.
+        self.log_misses = log_misses
+        self._miss_counts = {}  # pair_id -> misses since last flush
+        self._miss_flush_ns = int(miss_flush_interval * 1_000_000_000)
+        self._last_miss_flush_ns = time.monotonic_ns()
+
         # OPT #17: Cache for arbitrage calculations (100ms TTL)
-        self._arb_cache = {}  # key: (k_ticker, p_ticker, prices_tuple) -> (result, timestamp)
-        self._cache_ttl_ms = 100  # 100ms TTL
+        # Bounded LRU: every new price tuple is a new key, so an unbounded dict grows forever
+        # Structure-of-arrays: the LRU dict maps key -> slot; results/timestamps live in parallel arrays
+        self._arb_cache = OrderedDict()  # key: packed int (see check_hard_arbitrage) -> slot index
+        self._cache_keys = []  # slot -> key (None when free)
+        self._cache_results = []  # slot -> Optional[ArbitrageOpportunity]
+        self._cache_ts = array('q')  # slot -> monotonic_ns of insert
+        self._cache_free = []  # slots released by eviction/pruning
+        self._cache_inserts = 0
+        self._ticker_ids = {}  # ticker -> small int id for cache keys (< 2**20, see check_hard_arbitrage)
+        self._cache_ttl_ns = 100_000_000  # 100ms TTL
+        self._cache_max = 4096
+
+        # Recycled ArbitrageOpportunity instances (see _acquire_opp / release_opp)
+        self._opp_pool = deque(maxlen=256)
+        # id(opp) -> executions currently holding it: a cached opp can be handed to two concurrent
+        # executions (Kalshi and Poly listeners run in separate tasks), so it's only pooled once all are done
+        self._opp_inflight = {}
+
+        # OPT #2: Resolved (yes_token, no_token) per Polymarket ticker
+        self._poly_token_cache = {}  # ticker -> (metadata, (yes_token, no_token))
 
     def check_hard_arbitrage(self, k_event: MarketEvent, p_event: MarketEvent, pair_id: int = None) -> Optional[ArbitrageOpportunity]:
         """
         Strategy 1: Hard Arbitrage.
         Target: Buy YES on A and NO on B (or vice versa) if sum(prices) < 1.0 - costs
         """
+        # Each price is read off the events exactly once
+        k_y = k_event.yes_price
+        k_n = k_event.no_price
+        p_y = p_event.yes_price
+        p_n = p_event.no_price
+
         # OPT #17: Check cache first (100ms TTL)
-        # Create cache key from tickers and prices
-        prices_tuple = (
-            round(k_event.yes_price, 4),
-            round(k_event.no_price, 4),
-            round(p_event.yes_price, 4),
-            round(p_event.no_price, 4)
+        # Single int key: ticker ids + prices quantized to 1/10000 ticks, 16 bits each
+        ids = self._ticker_ids
+        if len(ids) >= 0xFFFFF:
+            # pid sits in bits 64-83: ids must stay below 2**20 or keys of different pairs collide
+            self.reset_cache()
+            ids = self._ticker_ids
+        kid = ids.get(k_event.ticker)
+        if kid is None:
+            kid = ids[k_event.ticker] = len(ids)
+        pid = ids.get(p_event.ticker)
+        if pid is None:
+            pid = ids[p_event.ticker] = len(ids)
+        cache_key = (
+            (kid << 84) | (pid << 64)
+            | (round(k_y * 10000) << 48)
+            | (round(k_n * 10000) << 32)
+            | (round(p_y * 10000) << 16)
+            | round(p_n * 10000)
         )
-        cache_key = (k_event.ticker, p_event.ticker, prices_tuple)
 
-        now_ms = time.time() * 1000
-        if cache_key in self._arb_cache:
-            cached_result, cached_time_ms = self._arb_cache[cache_key]
-            age_ms = now_ms - cached_time_ms
+        slot = self._arb_cache.get(cache_key)
+        if slot is not None:
+            now_ns = time.monotonic_ns()
 
-            if age_ms < self._cache_ttl_ms:
+            if now_ns - self._cache_ts[slot] < self._cache_ttl_ns:
                 # Cache hit - return cached result
-                return cached_result
-
-        # OPT #16: Quick pre-filter to avoid expensive calculations
-        # Check if arbitrage is even POSSIBLE before full calc
-        min_cost_a = p_event.yes_price + k_event.no_price
-        min_cost_b = p_event.no_price + k_event.yes_price
-        min_cost = min(min_cost_a, min_cost_b)
-
-        # Conservative estimate: needs at least 2% margin for fees + profit
-        if min_cost > 0.98:
-            # No room for profit after fees - skip expensive calculation
-            # Cache negative result
-            self._arb_cache[cache_key] = (None, now_ms)
-            return None
+                self._arb_cache.move_to_end(cache_key)
+                return self._cache_results[slot]
+        else:
+            now_ns = time.monotonic_ns()
 
         # Fees
         # Poly: Fixed per unit (from config)
         # Kalshi: % of value (from config)
         FEE_POLY = self.fee_poly
         FEE_KALSHI_RATE = self.fee_kalshi
+        MIN_PROFIT = self.min_profit
 
         # Scenario A: Poly YES + Kalshi NO
-        # We buy YES on Poly and NO on Kalshi.
-        # Note: k_event.no_price is the cost to buy NO? 
-        # MarketEvent definition: no_price = 1.0 - yes_price. 
-        # Make sure this reflects the ASK price for NO.
+        # Scenario B: Poly NO + Kalshi YES
         # For simplicity, assuming yes_price and no_price are actionable Asks.
-        
-        cost_a_poly = p_event.yes_price
-        cost_a_kalshi = k_event.no_price
-        cost_a_total = cost_a_poly + cost_a_kalshi
-        
-        fee_a_poly = FEE_POLY
-        fee_a_kalshi = cost_a_kalshi * FEE_KALSHI_RATE
-        total_fees_a = fee_a_poly + fee_a_kalshi
-        
-        net_profit_a = 1.0 - cost_a_total - total_fees_a
+        cost_a_total = p_y + k_n
+        cost_b_total = p_n + k_y
 
-        # Scenario B: Poly NO + Kalshi YES
-        cost_b_poly = p_event.no_price
-        cost_b_kalshi = k_event.yes_price
-        cost_b_total = cost_b_poly + cost_b_kalshi
-        
-        fee_b_poly = FEE_POLY
-        fee_b_kalshi = cost_b_kalshi * FEE_KALSHI_RATE
-        total_fees_b = fee_b_poly + fee_b_kalshi
-        
-        net_profit_b = 1.0 - cost_b_total - total_fees_b
-        
-        # Determine Best
-        if net_profit_a > net_profit_b:
-            best_side = 'A'
-            best_profit = net_profit_a
-            gross_cost = cost_a_total
-            # Log Details for A
-            # PolyMarket: Cost {cost_a_poly} | P_YES {p_event.yes_price} + K_NO {k_event.no_price}
-            # Kalshi: ... wait, Cost should match?
-            # User format: "PolyMarket: Cost 1.220 | P_YES 0.36 + K_NO 0.86" -> This line seems to sum P_YES + K_NO ? 
-            # No, user says "PolyMarket: Cost...". This implies the cost IS the sum.
-            # But the line below says "Kalshi: Cost...".
-            # The user example:
-            # PolyMarket: Cost 1.220 | P_YES 0.36 + K_NO 0.86  <-- This line describes Scenario A?
-            # Kalshi: Cost 1.090 | P_NO 0.65 + K_YES 0.44      <-- This line describes Scenario B?
-            # Ah, the label "PolyMarket" and "Kalshi" in the user example might be confusing or refer to the "Primary" market?
-            # Actually, "P_YES... + K_NO" clearly mixes both. 
-            # Let's interpret the user's log lines as:
-            # Line 1: Scenario A (P_YES + K_NO)
-            # Line 2: Scenario B (P_NO + K_YES)
-            
-            # Re-reading user request:
-            # [INFO] [CrossArb] Analysis ...:
-            # PolyMarket: Cost 1.220 | P_YES 0.36 + K_NO 0.86  <-- Likely meant "Scenario 1" or labeled by the Poly side?
-            # Kalshi: Cost 1.090 | P_NO 0.65 + K_YES 0.44      <-- Likely meant "Scenario 2"
-            
-            # I will Label them "Scenario P_YES" and "Scenario P_NO" or just follow the user's potentially shorthand labels.
-            # I'll use "Option A (P_YES/K_NO)" and "Option B (P_NO/K_YES)" for clarity, or map "PolyMarket" to the side where we buy something on Poly?
-            # In Line 1, we buy P_YES. In Line 2, we buy P_NO.
-            # So "PolyMarket" label -> We buy Poly YES?
-            # And "Kalshi" label -> We buy Kalshi YES? (Line 2 has K_YES).
-            # This makes sense. 
-            
-            # Let's generate the string.
-            
-            scen_a_str = f"PolyMarket (Buy Yes): Cost {cost_a_total:.3f} | P_YES {p_event.yes_price:.2f} + K_NO {k_event.no_price:.2f}"
-            scen_b_str = f"Kalshi (Buy Yes):     Cost {cost_b_total:.3f} | P_NO {p_event.no_price:.2f} + K_YES {k_event.yes_price:.2f}"
-            
-            # The User example explicitly had "PolyMarket: ..." and "Kalshi: ...".
-            # I will use that exact text if possible, assuming "PolyMarket" means P_YES direction and "Kalshi" means K_YES direction.
-            
-            # (Analysis logging moved to live logic below)
-        
-        msg = f"[CrossArb] Analysis {p_event.ticker}:\n"
-        msg += f"PolyMarket: Cost {cost_a_total:.3f} | P_YES {p_event.yes_price:.2f} + K_NO {k_event.no_price:.2f}\n"
-        msg += f"Kalshi:     Cost {cost_b_total:.3f} | P_NO {p_event.no_price:.2f} + K_YES {k_event.yes_price:.2f}\n"
-        
-        best_profit = max(net_profit_a, net_profit_b)
-        is_a_best = (net_profit_a >= net_profit_b)
-        
-        best_lbl = "A (Poly)" if is_a_best else "B (Kalshi)"
-        best_gross = (1.0 - cost_a_total) if is_a_best else (1.0 - cost_b_total)
-        
-        msg += f"Best: {best_lbl} (Gross {best_gross:.3f} | Net {best_profit:.3f} | Req {self.min_profit:.3f})"
-        logger.info(msg)
+        # OPT #16: Quick pre-filter to avoid expensive calculations
+        # Conservative estimate: needs at least 2% margin for fees + profit
+        if min(cost_a_total, cost_b_total) > 0.98:
+            # No room for profit after fees - skip expensive calculation
+            # Cache negative result
+            self._cache_put(cache_key, None, now_ns)
+            return None
+
+        net_profit_a, net_profit_b, total_fees_a, total_fees_b = _hard_arb_net(
+            k_y, k_n, p_y, p_n,
+            FEE_KALSHI_RATE, FEE_POLY
+        )
         
-        # Log to DB
-        decision = "NO BUY"
-        reason = f"Net Profit {best_profit:.3f} < {self.min_profit:.3f}"
+        # Determine Best (branchless select: one comparison, index into the pair)
+        diff = net_profit_a - net_profit_b
+        is_a_best = diff >= 0.0
+        best_profit = net_profit_b + diff * is_a_best
         
-        if best_profit > self.min_profit:
+        best_lbl = ("B (Kalshi)", "A (Poly)")[is_a_best]
+        log_db = self.db_manager and pair_id
+
+        if best_profit > MIN_PROFIT:
+            # Analysis is only built on hits: misses are the per-tick common case
+            best_gross = 1.0 - (cost_b_total, cost_a_total)[is_a_best]
+            logger.info(
+                "[CrossArb] Analysis %s:\n"
+                "PolyMarket: Cost %.3f | P_YES %.2f + K_NO %.2f\n"
+                "Kalshi:     Cost %.3f | P_NO %.2f + K_YES %.2f\n"
+                "Best: %s (Gross %.3f | Net %.3f | Req %.3f)",
+                p_event.ticker,
+                cost_a_total, p_y, k_n,
+                cost_b_total, p_n, k_y,
+                best_lbl, best_gross, best_profit, MIN_PROFIT
+            )
             decision = f"BUY {best_lbl}"
-            reason = f"Net Profit {best_profit:.3f} > {self.min_profit:.3f}"
-            
-        if self.db_manager and pair_id:
-             details = {
-                 "fee_rate_poly": FEE_POLY,
-                 "fee_rate_kalshi": FEE_KALSHI_RATE,
-                 "fees_a": total_fees_a,
-                 "fees_b": total_fees_b,
-                 "best_side": best_lbl
-             }
-             self.db_manager.log_opportunity(
-                 pair_id, 
-                 k_event.yes_price, k_event.no_price, 
-                 p_event.yes_price, p_event.no_price,
-                 cost_a_total, cost_b_total, 
-                 best_profit, decision, reason, details
-             )
-
-        if best_profit > self.min_profit:
             logger.info(f"[CrossArb] DECISION: {decision}")
 
+            # Log to DB
+            if log_db:
+                self.db_manager.log_hard_arb(HardArbRecord(
+                    pair_id,
+                    k_y, k_n, p_y, p_n,
+                    cost_a_total, cost_b_total,
+                    best_profit, decision, f"Net Profit {best_profit:.3f} > {MIN_PROFIT:.3f}",
+                    FEE_POLY, FEE_KALSHI_RATE, total_fees_a, total_fees_b, best_lbl
+                ))
+
             # OPT #2: Pre-compute Polymarket token IDs to avoid lookup in execution
             poly_token_yes, poly_token_no = self._get_poly_tokens(p_event)
 
-            if is_a_best:
-                 # A = P_YES + K_NO -> NO_K_YES_P
-                 result = ArbitrageOpportunity(
-                     'HARD', k_event, p_event, best_profit, 'NO_K_YES_P',
-                     poly_token_yes=poly_token_yes,
-                     poly_token_no=poly_token_no
-                 )
-            else:
-                 # B = P_NO + K_YES -> YES_K_NO_P
-                 result = ArbitrageOpportunity(
-                     'HARD', k_event, p_event, best_profit, 'YES_K_NO_P',
-                     poly_token_yes=poly_token_yes,
-                     poly_token_no=poly_token_no
-                 )
+            # A = P_YES + K_NO -> NO_K_YES_P
+            # B = P_NO + K_YES -> YES_K_NO_P
+            buy_side = ('YES_K_NO_P', 'NO_K_YES_P')[is_a_best]
+            result = self._acquire_opp(
+                'HARD', k_event, p_event, best_profit, buy_side,
+                poly_token_yes, poly_token_no
+            )
 
             # OPT #17: Cache positive result
-            self._arb_cache[cache_key] = (result, now_ms)
+            self._cache_put(cache_key, result, now_ns)
             return result
         else:
-            logger.info(f"[CrossArb] DECISION: {decision}")
+            logger.debug("[CrossArb] DECISION: NO BUY")
+            if log_db:
+                if self.log_misses:
+                    self.db_manager.log_hard_arb(HardArbRecord(
+                        pair_id,
+                        k_y, k_n, p_y, p_n,
+                        cost_a_total, cost_b_total,
+                        best_profit, "NO BUY", f"Net Profit {best_profit:.3f} < {MIN_PROFIT:.3f}",
+                        FEE_POLY, FEE_KALSHI_RATE, total_fees_a, total_fees_b, best_lbl
+                    ))
+                else:
+                    self._count_miss(pair_id, now_ns)
             # OPT #17: Cache negative result
-            self._arb_cache[cache_key] = (None, now_ms)
+            self._cache_put(cache_key, None, now_ns)
             return None
 
+    def _acquire_opp(self, opp_type: str, k_event: MarketEvent, p_event: MarketEvent, profit: float, buy_side: str,
+                     poly_token_yes: Optional[str] = None, poly_token_no: Optional[str] = None) -> ArbitrageOpportunity:
+        """Reuse a released ArbitrageOpportunity if one is pooled, otherwise allocate a new one."""
+        if not self._opp_pool:
+            return ArbitrageOpportunity(
+                opp_type, k_event, p_event, profit, buy_side,
+                poly_token_yes=poly_token_yes,
+                poly_token_no=poly_token_no
+            )
+        opp = self._opp_pool.pop()
+        opp.type = opp_type
+        opp.event_kalshi = k_event
+        opp.event_poly = p_event
+        opp.profit_potential = profit
+        opp.buy_side = buy_side
+        opp.timestamp = None
+        opp.poly_token_yes = poly_token_yes
+        opp.poly_token_no = poly_token_no
+        return opp
+
+    def retain_opp(self, opp: ArbitrageOpportunity):
+        """Mark an opportunity as held by an execution; every retain_opp must be paired with release_opp."""
+        inflight = self._opp_inflight
+        key = id(opp)
+        inflight[key] = inflight.get(key, 0) + 1
+
+    def release_opp(self, opp: ArbitrageOpportunity):
+        """
+        Return an opportunity to the pool once the execution layer is done with it.
+        Instances still held by another execution, or that a live cache entry can still hand out,
+        are left alone; expired entries are dropped first.
+        """
+        inflight = self._opp_inflight
+        key = id(opp)
+        holders = inflight.get(key, 0) - 1
+        if holders > 0:
+            inflight[key] = holders
+            return
+        inflight.pop(key, None)
+
+        results = self._cache_results
+        for slot, cached in enumerate(results):
+            if cached is opp:
+                if time.monotonic_ns() - self._cache_ts[slot] < self._cache_ttl_ns:
+                    return
+                del self._arb_cache[self._cache_keys[slot]]
+                self._release_slot(slot)
+        opp.event_kalshi = opp.event_poly = None
+        self._opp_pool.append(opp)
+
+    def _count_miss(self, pair_id: int, now_ns: int):
+        """Accumulate a NO BUY for pair_id; hand the counts to the DB every miss_flush_interval."""
+        counts = self._miss_counts
+        counts[pair_id] = counts.get(pair_id, 0) + 1
+        if now_ns - self._last_miss_flush_ns >= self._miss_flush_ns:
+            self._last_miss_flush_ns = now_ns
+            self._miss_counts = {}
+            self.db_manager.log_miss_batch(counts)
+
+    def flush_misses(self, force: bool = True):
+        """
+        Hand accumulated miss counts to the DB now (force=False: only if miss_flush_interval has passed).
+        _count_miss only flushes when another miss arrives, so callers use this on a timer and at shutdown.
+        """
+        now_ns = time.monotonic_ns()
+        if not force and now_ns - self._last_miss_flush_ns < self._miss_flush_ns:
+            return
+        self._last_miss_flush_ns = now_ns
+        counts = self._miss_counts
+        if counts and self.db_manager:
+            self._miss_counts = {}
+            self.db_manager.log_miss_batch(counts)
+
+    def reset_cache(self):
+        """
+        Drop the OPT #17 result cache and the ticker ids its keys are built from.
+        Called when the locked pairs are replaced, so ids of expired markets don't accumulate.
+        """
+        self._arb_cache.clear()
+        self._cache_keys = []
+        self._cache_results = []
+        self._cache_ts = array('q')
+        self._cache_free = []
+        self._ticker_ids = {}
+
+    def _cache_put(self, cache_key, result, now_ns):
+        """OPT #17: Insert into the bounded LRU, evicting the least recently used entry when full."""
+        cache = self._arb_cache
+        slot = cache.get(cache_key)
+        if slot is not None:
+            self._cache_results[slot] = result
+            self._cache_ts[slot] = now_ns
+            cache.move_to_end(cache_key)
+        else:
+            if self._cache_free:
+                slot = self._cache_free.pop()
+                self._cache_keys[slot] = cache_key
+                self._cache_results[slot] = result
+                self._cache_ts[slot] = now_ns
+            else:
+                slot = len(self._cache_keys)
+                self._cache_keys.append(cache_key)
+                self._cache_results.append(result)
+                self._cache_ts.append(now_ns)
+            cache[cache_key] = slot
+            if len(cache) > self._cache_max:
+                _, old = cache.popitem(last=False)
+                self._release_slot(old)
+
+        self._cache_inserts += 1
+        if not self._cache_inserts & 1023:
+            self._prune_cache(now_ns)
+
+    def _release_slot(self, slot: int):
+        self._cache_keys[slot] = None
+        self._cache_results[slot] = None
+        self._cache_free.append(slot)
+
+    def _prune_cache(self, now_ns: int):
+        """Drop every expired entry in one pass over the contiguous timestamp array."""
+        cutoff = now_ns - self._cache_ttl_ns
+        keys = self._cache_keys
+        cache = self._arb_cache
+        for slot, ts in enumerate(self._cache_ts):
+            if ts < cutoff and keys[slot] is not None:
+                del cache[keys[slot]]
+                self._release_slot(slot)
+
+    def scan_batch(self, pairs: List[Tuple[MarketEvent, MarketEvent, Optional[int]]]) -> List[Tuple[ArbitrageOpportunity, MarketEvent, MarketEvent]]:
+        """
+        Scan many (k_event, p_event, pair_id) candidates at once.
+        Prices are gathered into parallel arrays and run through _scan_hard in one call;
+        only pairs clearing min_profit go through the full check_hard_arbitrage path.
+        """
+        if not pairs:
+            return []
+
+        k_yes = [ke.yes_price for ke, _, _ in pairs]
+        k_no = [ke.no_price for ke, _, _ in pairs]
+        p_yes = [pe.yes_price for _, pe, _ in pairs]
+        p_no = [pe.no_price for _, pe, _ in pairs]
+        hits = _scan_hard(k_yes, k_no, p_yes, p_no, self.fee_kalshi, self.fee_poly, self.min_profit)
+
+        # Only hits get an ArbitrageOpportunity (built by the full single-pair path: cache, logging, DB)
+        results = []
+        for i in hits:
+            ke, pe, pair_id = pairs[i]
+            opp = self.check_hard_arbitrage(ke, pe, pair_id)
+            if opp:
+                results.append((opp, ke, pe))
+        return results
+
     def _get_poly_tokens(self, p_event: MarketEvent) -> Tuple[Optional[str], Optional[str]]:
         """
         OPT #2: Pre-compute YES and NO token IDs from Polymarket event.
         Returns (yes_token, no_token) tuple.
+        Resolved pairs are cached per ticker while the event's metadata dict is unchanged.
         """
+        cached = self._poly_token_cache.get(p_event.ticker)
+        if cached is not None and cached[0] is p_event.metadata:
+            return cached[1]
+
+        tokens = self._resolve_poly_tokens(p_event)
+        if tokens[0] is not None:
+            self._poly_token_cache[p_event.ticker] = (p_event.metadata, tokens)
+        return tokens
+
+    def _resolve_poly_tokens(self, p_event: MarketEvent) -> Tuple[Optional[str], Optional[str]]:
+        """Walk clobTokenIds/outcomes metadata to map YES/NO token IDs."""
         try:
             token_ids = p_event.metadata.get('clobTokenIds', []) if p_event.metadata else []
             if not token_ids or len(token_ids) < 2:
@@ -252,12 +424,15 @@ class ArbitrageDetector:
         Checks for large spread divergence.
         """
         # Implied probability often approx equals price
-        prob_diff = abs(k_event.yes_price - p_event.yes_price)
+        k_yes = k_event.yes_price
+        p_yes = p_event.yes_price
+        diff = k_yes - p_yes
+        prob_diff = diff if diff >= 0.0 else -diff
         
         # If diff > threshold (e.g. 15%), it's an Arb signal
         if prob_diff > 0.15:
             # We buy the "cheaper" probability
-            direction = 'YES_K_NO_P' if k_event.yes_price < p_event.yes_price else 'NO_K_YES_P'
+            direction = ('NO_K_YES_P', 'YES_K_NO_P')[diff < 0.0]
             logger.info(f"PROB ARB FOUND: Diff {prob_diff:.2f}. Direction: {direction}")
             return ArbitrageOpportunity('PROB', k_event, p_event, prob_diff, direction)
             
@@ -3,12 +3,15 @@ import asyncio
 import logging
 import dataclasses
 import os
+import itertools
+import re
 import time
+from collections import OrderedDict, deque
 from datetime import datetime
 from typing import Optional, List, Dict
 
 # Local Modules
-from config_manager import config
+from config_manager import config, FEES
 from market_data import KalshiFeed, PolymarketFeed, MarketEvent
 from event_matcher import EventMatcher
 from arbitrage_engine import ArbitrageDetector
@@ -19,12 +22,38 @@ from websocket_feeds import WebSocketManager, OrderbookCache
 
 logger = logging.getLogger("ArbitrageBot")
 
+# Discovery filters: one C-level regex scan per title/ticker instead of ~7 substring searches.
+# The captured keyword doubles as the asset tag used for bucketing (see ASSET_TAGS).
+_ASSET_RE = re.compile(r"(Bitcoin|BTC|Ethereum|ETH|Solana|SOL)")
+_KALSHI_TICKER_RE = re.compile(r"KX(BTC|ETH|SOL)")
+ASSET_TAGS = {
+    "Bitcoin": "BTC", "BTC": "BTC",
+    "Ethereum": "ETH", "ETH": "ETH",
+    "Solana": "SOL", "SOL": "SOL",
+}
+
 class ArbitrageBot:
     def __init__(self):
         self.running = False
+        self._stop_event = asyncio.Event()  # Set by stop(); wakes every _wait_or_stop() immediately
         self.config = config
-        self.execution_history = {} # Key: "type:kid:pid" -> timestamp
+        self._loop = None  # Set in run_async; reused for every run_in_executor call
+        self.execution_history = OrderedDict() # Key: "type:kid:pid" -> timestamp (LRU, capped)
+        self.EXECUTION_HISTORY_MAX = 1024
         self.locked_pairs = []
+        # locked_pairs indexed by websocket identifier (see _index_locked_pairs)
+        self.pair_by_kalshi_ticker: Dict[str, list] = {}
+        self.pair_by_poly_token: Dict[str, list] = {}
+        self._locked_pair_keys = set()  # (kalshi event_id, poly event_id) of every locked pair
+        self._close_epoch = {}  # Kalshi ticker -> resolution_time as epoch seconds (hot-path close check)
+        self._clob_tokens = {}  # Poly ticker -> clobTokenIds[0] (resolved at discovery, see _clob_token)
+        self._priced_levels = {}  # id(MarketEvent) -> book level lists that event's prices came from
+        self._last_prices = {}  # (Kalshi ticker, Poly token) -> prices at the last hard-arb evaluation
+        # Rejected opportunities awaiting the batched DB flush (see _rejected_flush_loop)
+        self._rejected_queue = deque(maxlen=10000)
+        self.REJECTED_FLUSH_INTERVAL = 0.5
+        # Market pair registrations, consumed by the single _db_writer task started in run_async
+        self._db_write_queue = asyncio.Queue()
         # WebSocket mode disabled - REST polling is more reliable for orderbook data
         # WebSockets don't push orderbook updates frequently enough
         self.use_websockets = False  # Flag to enable/disable WebSocket mode
@@ -40,14 +69,14 @@ class ArbitrageBot:
         self.config.validate_keys()
 
         # Initialize Sub-Components
-        self.db_manager = DatabaseManager()
+        self.db_manager = DatabaseManager(fast_mode=self.config.db_fast_mode)
         # User has ~$4 on Kalshi. Assuming matching $4 on Poly => $8 Total.
         self.risk = RiskManager(current_bankroll=8.0)
 
         # Inject Fees from Config
         self.detector = ArbitrageDetector(
-            fee_kalshi=self.config.fee_config.kalshi_taker_rate,
-            fee_poly=self.config.fee_config.poly_flat_fee,
+            fee_kalshi=FEES.kalshi_taker_rate,
+            fee_poly=FEES.poly_flat_fee,
             db_manager=self.db_manager
         )
 
@@ -82,13 +111,16 @@ class ArbitrageBot:
         )
 
     async def fetch_kalshi_data(self):
-        """Fetch Kalshi markets (async wrapper for sync API)"""
-        loop = asyncio.get_event_loop()
-        k_btc_15 = await loop.run_in_executor(None, self.kalshi_feed.fetch_events, 100, "KXBTC15M")
-        k_eth_15 = await loop.run_in_executor(None, self.kalshi_feed.fetch_events, 100, "KXETH15M")
-        k_sol_15 = await loop.run_in_executor(None, self.kalshi_feed.fetch_events, 100, "KXSOL15M")
+        """Fetch Kalshi markets (native aiohttp, no executor threads)"""
+        # Independent series - fetch concurrently (latency ~ max RTT instead of sum)
+        k_btc_15, k_eth_15, k_sol_15 = await asyncio.gather(
+            self.kalshi_feed.fetch_events_async(100, "KXBTC15M"),
+            self.kalshi_feed.fetch_events_async(100, "KXETH15M"),
+            self.kalshi_feed.fetch_events_async(100, "KXSOL15M")
+        )
 
-        all_kalshi = {e.event_id: e for e in k_btc_15 + k_eth_15 + k_sol_15}.values()
+        # chain() dedupes straight from the three responses, no concatenated temporary list
+        all_kalshi = {e.event_id: e for e in itertools.chain(k_btc_15, k_eth_15, k_sol_15)}.values()
         events = list(all_kalshi)
 
         counts = {
@@ -100,18 +132,14 @@ class ArbitrageBot:
         return events
 
     async def fetch_poly_data(self):
-        """Fetch Polymarket markets (async wrapper for sync API)"""
-        loop = asyncio.get_event_loop()
-
+        """Fetch Polymarket markets (native aiohttp, no executor threads)"""
         # OPTIMIZATION: Only fetch 20 most recent markets instead of 100
         # Since we only need 3-5 active markets (BTC, ETH, SOL every 15min),
         # fetching 20 gives us enough buffer while being much faster
         #
         # Also skip token validation (validate_tokens=False) - we'll validate
         # AFTER matching pairs, which is 10x faster
-        poly_15m = await loop.run_in_executor(
-            None,
-            self.poly_feed.fetch_events,
+        poly_15m = await self.poly_feed.fetch_events_async(
             20,       # limit - only get 20 most recent (vs 100)
             102467,   # tag_id (15min markets)
             'active', # status
@@ -121,7 +149,8 @@ class ArbitrageBot:
         logger.info(f"Fetched {len(poly_15m)} Polymarket 15m markets.")
         return poly_15m
 
-    def filter_market_for_monitoring(self, ke: MarketEvent, pe: MarketEvent) -> bool:
+    def filter_market_for_monitoring(self, ke: MarketEvent, pe: MarketEvent,
+                                     time_to_close_k: float = None, time_to_close_p: float = None) -> bool:
         """
         Light filter for market discovery - only filter out CLOSED markets.
         We want to monitor CURRENT markets (even if they close soon).
@@ -131,17 +160,18 @@ class ArbitrageBot:
         - 22:45 market (closes in 3 min) = ACTIVE, trade this!
         - 23:00 market (closes in 18 min) = FUTURE, monitor but don't prioritize
         - 22:30 market (closed 12 min ago) = CLOSED, filter out
-        """
-        now = datetime.now()
 
-        # Check time to close
-        time_to_close_k = (ke.resolution_time - now).total_seconds()
-        time_to_close_p = (pe.resolution_time - now).total_seconds()
+        discover_markets passes time-to-close precomputed once per event; otherwise it is derived here.
+        """
+        if time_to_close_k is None or time_to_close_p is None:
+            now = datetime.now()
+            time_to_close_k = (ke.resolution_time - now).total_seconds()
+            time_to_close_p = (pe.resolution_time - now).total_seconds()
 
         # Filter out ONLY markets that are already CLOSED (negative time)
         # DO NOT filter markets closing soon - those are the active ones we want!
         if time_to_close_k < 0 or time_to_close_p < 0:
-            logger.debug(f"Filtered {ke.ticker}: Market already closed (K:{time_to_close_k:.0f}s, P:{time_to_close_p:.0f}s)")
+            logger.debug("Filtered %s: Market already closed (K:%.0fs, P:%.0fs)", ke.ticker, time_to_close_k, time_to_close_p)
             return False
 
         # DO NOT filter by extreme probabilities here - we want to monitor ALL markets
@@ -155,22 +185,17 @@ class ArbitrageBot:
         This is where we check for extreme probabilities.
         """
         # Check for extreme probabilities - no point trading if no arb opportunity
-        # Kalshi
-        if ke.yes_price > 0.90 or ke.yes_price < 0.10:
-            logger.debug(f"Cannot trade {ke.ticker}: Extreme Kalshi probability (YES: {ke.yes_price:.2%})")
-            return False
-
-        if ke.no_price > 0.90 or ke.no_price < 0.10:
-            logger.debug(f"Cannot trade {ke.ticker}: Extreme Kalshi probability (NO: {ke.no_price:.2%})")
-            return False
-
-        # Polymarket
-        if pe.yes_price > 0.90 or pe.yes_price < 0.10:
-            logger.debug(f"Cannot trade {pe.ticker}: Extreme Poly probability (YES: {pe.yes_price:.2%})")
+        # Each side is tradeable only if both its prices sit inside [0.10, 0.90]
+        k_yes, k_no = ke.yes_price, ke.no_price
+        if not (0.10 <= min(k_yes, k_no) and max(k_yes, k_no) <= 0.90):
+            logger.debug("Cannot trade %s: Extreme Kalshi probability (YES: %.2f%%, NO: %.2f%%)",
+                         ke.ticker, k_yes * 100, k_no * 100)
             return False
 
-        if pe.no_price > 0.90 or pe.no_price < 0.10:
-            logger.debug(f"Cannot trade {pe.ticker}: Extreme Poly probability (NO: {pe.no_price:.2%})")
+        p_yes, p_no = pe.yes_price, pe.no_price
+        if not (0.10 <= min(p_yes, p_no) and max(p_yes, p_no) <= 0.90):
+            logger.debug("Cannot trade %s: Extreme Poly probability (YES: %.2f%%, NO: %.2f%%)",
+                         pe.ticker, p_yes * 100, p_no * 100)
             return False
 
         return True
@@ -185,29 +210,46 @@ class ArbitrageBot:
             self.fetch_poly_data()
         )
 
-        # Filter candidates
-        keywords = ["Bitcoin", "BTC", "Ethereum", "ETH", "Solana", "SOL"]
-
-        k_candidates = [
-            e for e in kalshi_events
-            if any(k in e.title for k in keywords) or "KXBTC" in e.ticker or "KXETH" in e.ticker or "KXSOL" in e.ticker
-        ]
-
-        p_candidates = [
-            e for e in poly_events
-            if any(k in e.title for k in keywords) and ("Up or Down" in e.title)
-        ]
+        # Filter candidates, keeping the matched asset tag and time-to-close (one clock read
+        # for the whole discovery instead of one per matched pair): [(event, asset, ttc), ...]
+        now = datetime.now()
+        k_candidates = []
+        for e in kalshi_events:
+            m = _KALSHI_TICKER_RE.search(e.ticker) or _ASSET_RE.search(e.title)
+            if m:
+                k_candidates.append((e, ASSET_TAGS[m.group(1)], (e.resolution_time - now).total_seconds()))
+
+        p_candidates = []
+        for e in poly_events:
+            if "Up or Down" in e.title:
+                m = _ASSET_RE.search(e.title)
+                if m:
+                    p_candidates.append((e, ASSET_TAGS[m.group(1)], (e.resolution_time - now).total_seconds()))
 
         logger.info(f"Matching {len(k_candidates)} Kalshi vs {len(p_candidates)} Poly events.")
 
+        # Block Poly candidates by (asset, matcher block key) so each Kalshi event is only compared
+        # against same-asset markets whose resolution time is within the matcher's tolerance window
+        block_key = self.matcher.block_key
+        max_diff = self.matcher.MAX_RESOLUTION_DIFF
+        p_buckets = {}
+        for pe, asset, ttc_p in p_candidates:
+            p_buckets.setdefault((asset, block_key(pe)), []).append((pe, ttc_p))
+
         # Match pairs and filter (only filter closed/closing markets, NOT extreme probabilities)
         matched_pairs = []
-        for ke in k_candidates:
-            for pe in p_candidates:
-                if self.matcher.are_equivalent(ke, pe):
-                    # Apply light filters (only time-based, not probability-based)
-                    if self.filter_market_for_monitoring(ke, pe):
-                        matched_pairs.append((ke, pe))
+        for ke, asset, ttc_k in k_candidates:
+            key = block_key(ke)
+            for s in (key - 1, key, key + 1):
+                for pe, ttc_p in p_buckets.get((asset, s), ()):
+                    # ttc_k - ttc_p == resolution time difference (same `now`): exact float pre-check,
+                    # so neighbouring-block pairs outside tolerance skip are_equivalent entirely
+                    if abs(ttc_k - ttc_p) > max_diff:
+                        continue
+                    if self.matcher.are_equivalent(ke, pe):
+                        # Apply light filters (only time-based, not probability-based)
+                        if self.filter_market_for_monitoring(ke, pe, ttc_k, ttc_p):
+                            matched_pairs.append((ke, pe))
 
         logger.info(f"Found {len(matched_pairs)} matched pairs for monitoring (probability filtering at execution time).")
 
@@ -216,85 +258,176 @@ class ArbitrageBot:
         logger.info(f"Validating tokens for {len(matched_pairs)} matched pairs...")
         validated_pairs = []
 
-        loop = asyncio.get_event_loop()
+        loop = self._loop or asyncio.get_running_loop()
+        to_validate = []
         for ke, pe in matched_pairs:
             # Get token ID from metadata
             clob_ids = pe.metadata.get('clobTokenIds', []) if pe.metadata else []
             if not clob_ids:
                 logger.debug(f"Skipping {pe.ticker}: No CLOB tokens")
                 continue
+            to_validate.append((ke, pe, clob_ids[0]))
 
-            token_id = clob_ids[0]
-
-            # Validate token exists in CLOB (this is the only validation we need)
-            is_valid = await loop.run_in_executor(None, self.poly_feed._validate_token, token_id)
+        # Validate tokens exist in CLOB (this is the only validation we need) - all requests in flight at once
+        results = await asyncio.gather(
+            *(loop.run_in_executor(None, self.poly_feed._validate_token, token_id) for _, _, token_id in to_validate),
+            return_exceptions=True
+        )
 
-            if is_valid:
+        for (ke, pe, token_id), is_valid in zip(to_validate, results):
+            if isinstance(is_valid, Exception):
+                logger.error(f"Token validation failed for {pe.ticker}: {is_valid}")
+            elif is_valid:
                 validated_pairs.append((ke, pe))
+                self._clob_tokens[pe.ticker] = token_id
             else:
                 logger.debug(f"Skipping {pe.ticker}: Invalid token {token_id}")
 
         logger.info(f"Found {len(validated_pairs)} pairs with valid tokens (filtered {len(matched_pairs) - len(validated_pairs)} invalid)")
         return validated_pairs
 
-    async def on_orderbook_update(self, source: str, identifier: str, cache: OrderbookCache):
+    async def on_orderbook_update(self, source: str, identifier: str, book: Optional[Dict], cache: OrderbookCache):
         """
         Callback triggered when WebSocket receives orderbook update.
         This is where real-time arbitrage detection happens.
 
-        PARALLEL MONITORING: Check ALL markets for arbitrage opportunities.
+        Only the pair(s) whose Kalshi ticker / Poly token produced the update are checked.
+        `book` is the orderbook that was just written, so that side skips the cache lookup.
         """
-        logger.debug(f"Orderbook update from {source}: {identifier}")
+        logger.debug("Orderbook update from %s: %s", source, identifier)
 
         # Check if we're in cooldown period after a trade
         now = time.time()
         if now < self.market_cooldown_until:
             remaining = int(self.market_cooldown_until - now)
-            logger.debug(f"In cooldown: {remaining}s remaining")
+            logger.debug("In cooldown: %ds remaining", remaining)
             return
 
-        # Check ALL market pairs for arbitrage (parallel monitoring)
-        for ke, pe in self.locked_pairs:
+        # Dispatch to the affected pair(s) only
+        index = self.pair_by_kalshi_ticker if source == 'kalshi' else self.pair_by_poly_token
+        pairs = index.get(identifier)
+        if not pairs:
+            return
+
+        close_epoch = self._close_epoch
+        for ke, pe in pairs:
             # Check if market is already CLOSED - skip if so
-            time_to_close = (ke.resolution_time - datetime.now()).total_seconds()
+            close_ts = close_epoch.get(ke.ticker)
+            if close_ts is None:
+                close_ts = close_epoch[ke.ticker] = ke.resolution_time.timestamp()
+            time_to_close = close_ts - now
             if time_to_close < 0:
-                logger.debug(f"Skipping {ke.ticker}: Market already closed ({time_to_close:.0f}s)")
+                logger.debug("Skipping %s: Market already closed (%.0fs)", ke.ticker, time_to_close)
                 continue
 
             # We WANT to trade on markets closing soon - those are the ACTIVE ones!
             # Don't skip markets just because they're about to close.
 
             # Check arbitrage for this pair
-            await self.check_arbitrage_live(ke, pe, cache)
+            await self.check_arbitrage_live(ke, pe, cache, source, identifier, book)
+
+    def _index_locked_pair(self, ke: MarketEvent, pe: MarketEvent):
+        """Register a locked pair under its Kalshi ticker and every Poly token for update dispatch."""
+        pair = (ke, pe)
+        self._locked_pair_keys.add((ke.event_id, pe.event_id))
+        self.pair_by_kalshi_ticker.setdefault(ke.ticker, []).append(pair)
+        for token in (pe.metadata.get('clobTokenIds', []) if pe.metadata else []):
+            self.pair_by_poly_token.setdefault(token, []).append(pair)
+        # Fresh event objects carry REST prices; force a re-parse from the live books
+        self._priced_levels.pop(id(ke), None)
+        self._priced_levels.pop(id(pe), None)
+        self._last_prices = {k: v for k, v in self._last_prices.items() if k[0] != ke.ticker}
+
+    def _index_locked_pairs(self):
+        """Rebuild the identifier indexes and dedup keys after self.locked_pairs is replaced."""
+        self.pair_by_kalshi_ticker = {}
+        self.pair_by_poly_token = {}
+        self._locked_pair_keys = set()
+        self._priced_levels = {}
+        self._last_prices = {}
+        self.detector.reset_cache()  # Its ticker ids would otherwise grow with every 15m market
+        for ke, pe in self.locked_pairs:
+            self._index_locked_pair(ke, pe)
+        # Forget close times / tokens of markets that are no longer locked
+        self._close_epoch = {t: ts for t, ts in self._close_epoch.items() if t in self.pair_by_kalshi_ticker}
+        locked_poly = {pe.ticker for _, pe in self.locked_pairs}
+        self._clob_tokens = {t: tok for t, tok in self._clob_tokens.items() if t in locked_poly}
+
+    def _clob_token(self, pe: MarketEvent) -> Optional[str]:
+        """First CLOB token of a Poly event, memoized per ticker (metadata is only walked on a miss)"""
+        token = self._clob_tokens.get(pe.ticker)
+        if token is None:
+            clob_ids = pe.metadata.get('clobTokenIds') if pe.metadata else None
+            if clob_ids:
+                token = self._clob_tokens[pe.ticker] = clob_ids[0]
+        return token
+
+    async def check_arbitrage_live(self, ke: MarketEvent, pe: MarketEvent, cache: OrderbookCache,
+                                   source: Optional[str] = None, identifier: Optional[str] = None,
+                                   updated_book: Optional[Dict] = None):
+        """
+        Check for arbitrage using live WebSocket orderbook data.
 
-    async def check_arbitrage_live(self, ke: MarketEvent, pe: MarketEvent, cache: OrderbookCache):
-        """Check for arbitrage using live WebSocket orderbook data"""
+        `updated_book` is the book that triggered this check (`source`/`identifier`); it is used as-is
+        and only the opposite side goes through the TTL-checked cache getter.
+        """
         try:
-            # Get live orderbooks from cache
-            k_ob = cache.get_kalshi(ke.ticker)
+            p_token = self._clob_token(pe)
 
-            p_token = pe.metadata.get('clobTokenIds', [])[0] if pe.metadata and pe.metadata.get('clobTokenIds') else None
-            p_ob = cache.get_poly(p_token) if p_token else None
+            # Get live orderbooks (the updated side is fresh by construction)
+            if source == 'kalshi' and updated_book is not None:
+                k_ob = updated_book
+            else:
+                k_ob = cache.get_kalshi(ke.ticker)
+
+            # Poly pairs are indexed under every token; only the first one is priced here
+            if source == 'poly' and updated_book is not None and identifier == p_token:
+                p_ob = updated_book
+            else:
+                p_ob = cache.get_poly(p_token) if p_token else None
 
             if not k_ob or not p_ob:
-                logger.debug(f"Missing orderbook data for {ke.ticker}")
+                logger.debug("Missing orderbook data for %s", ke.ticker)
                 return
 
             # Update MarketEvent with live prices from orderbooks
+            # Updates replace level lists wholesale, so a side whose lists are the ones we
+            # last priced from is unchanged and keeps its prices (normally only the updated side parses).
+            # Keyed per event object: two locked pairs may hold distinct events for one ticker/token,
+            # and each must be repriced itself
+            priced = self._priced_levels
+
             # Kalshi: get best ask prices
             k_yes_asks = k_ob.get('yes', [])
             k_no_asks = k_ob.get('no', [])
-
-            if k_yes_asks and k_yes_asks[0]:
-                ke.yes_price = float(k_yes_asks[0][0]) / 100.0  # Convert cents to dollars
-            if k_no_asks and k_no_asks[0]:
-                ke.no_price = float(k_no_asks[0][0]) / 100.0
+            k_seen = priced.get(id(ke))
+            if k_seen is None:
+                k_seen = priced[id(ke)] = [None, None]
+
+            if k_yes_asks is not k_seen[0]:
+                k_seen[0] = k_yes_asks
+                if k_yes_asks and k_yes_asks[0]:
+                    ke.yes_price = float(k_yes_asks[0][0]) / 100.0  # Convert cents to dollars
+            if k_no_asks is not k_seen[1]:
+                k_seen[1] = k_no_asks
+                if k_no_asks and k_no_asks[0]:
+                    ke.no_price = float(k_no_asks[0][0]) / 100.0
 
             # Polymarket: get best ask price
             p_asks = p_ob.get('asks', [])
-            if p_asks and p_asks[0]:
-                pe.yes_price = float(p_asks[0].get('price', 0))
-                pe.no_price = 1.0 - pe.yes_price
+            if p_asks is not priced.get(id(pe)):
+                priced[id(pe)] = p_asks
+                if p_asks and p_asks[0]:
+                    p_yes = float(p_asks[0].get('price', 0))
+                    pe.yes_price = p_yes
+                    pe.no_price = 1.0 - p_yes
+
+            # No top-of-book change since the last evaluation -> same verdict, skip it
+            cur = (ke.yes_price, ke.no_price, pe.yes_price, pe.no_price)
+            pair_key = (ke.ticker, p_token)
+            if self._last_prices.get(pair_key) == cur:
+                return
+            self._last_prices[pair_key] = cur
 
             # OPT #13: Skip DB write in hot path, pass None as pair_id
             # DB logging will happen async if arbitrage is detected
@@ -313,8 +446,8 @@ class ArbitrageBot:
                 else:
                     # Log rejected opportunity to database for dashboard visibility
                     rejection_reason = self._get_rejection_reason(ke, pe)
-                    logger.debug(f"Market {ke.ticker} rejected: {rejection_reason}")
-                    asyncio.create_task(self._log_rejected_opportunity(opp, ke, pe, rejection_reason))
+                    logger.debug("Market %s rejected: %s", ke.ticker, rejection_reason)
+                    self._queue_rejected_opportunity(opp, ke, pe, rejection_reason)
 
         except Exception as e:
             logger.error(f"Error in live arbitrage check: {e}")
@@ -337,11 +470,12 @@ class ArbitrageBot:
             new_tokens = []
 
             for ke, pe in new_matched:
-                if (ke, pe) not in self.locked_pairs:
+                if (ke.event_id, pe.event_id) not in self._locked_pair_keys:
                     new_tickers.append(ke.ticker)
                     tokens = pe.metadata.get('clobTokenIds', []) if pe.metadata else []
                     new_tokens.extend(tokens)
                     self.locked_pairs.append((ke, pe))
+                    self._index_locked_pair(ke, pe)
 
             if new_tickers or new_tokens:
                 logger.info(f"Subscribing to {len(new_tickers)} new Kalshi markets and {len(new_tokens)} new Poly tokens")
@@ -360,73 +494,90 @@ class ArbitrageBot:
 
     def _get_rejection_reason(self, ke: MarketEvent, pe: MarketEvent) -> str:
         """Determine why a market was rejected for trading"""
-        reasons = []
-
-        # Check Kalshi probabilities
-        if ke.yes_price > 0.90:
-            reasons.append(f"Kalshi YES too high ({ke.yes_price:.1%})")
-        if ke.yes_price < 0.10:
-            reasons.append(f"Kalshi YES too low ({ke.yes_price:.1%})")
-        if ke.no_price > 0.90:
-            reasons.append(f"Kalshi NO too high ({ke.no_price:.1%})")
-        if ke.no_price < 0.10:
-            reasons.append(f"Kalshi NO too low ({ke.no_price:.1%})")
-
-        # Check Polymarket probabilities
-        if pe.yes_price > 0.90:
-            reasons.append(f"Poly YES too high ({pe.yes_price:.1%})")
-        if pe.yes_price < 0.10:
-            reasons.append(f"Poly YES too low ({pe.yes_price:.1%})")
-        if pe.no_price > 0.90:
-            reasons.append(f"Poly NO too high ({pe.no_price:.1%})")
-        if pe.no_price < 0.10:
-            reasons.append(f"Poly NO too low ({pe.no_price:.1%})")
+        # One pass over the four probabilities; only out-of-range ones get formatted
+        checks = (
+            (ke.yes_price, "Kalshi YES"), (ke.no_price, "Kalshi NO"),
+            (pe.yes_price, "Poly YES"), (pe.no_price, "Poly NO"),
+        )
+        reasons = [
+            f"{name} {'too high' if v > 0.90 else 'too low'} ({v:.1%})"
+            for v, name in checks if v > 0.90 or v < 0.10
+        ]
 
         return "; ".join(reasons) if reasons else "Unknown"
 
-    async def _log_rejected_opportunity(self, opp, ke: MarketEvent, pe: MarketEvent, reason: str):
-        """Log rejected arbitrage opportunity to database (async)"""
+    def _queue_rejected_opportunity(self, opp, ke: MarketEvent, pe: MarketEvent, reason: str):
+        """Snapshot a rejected opportunity for the batched DB flush (no task/queue put per rejection)"""
+        details = {
+            'type': opp.type,
+            'buy_side': opp.buy_side,
+            'kalshi_ticker': ke.ticker,
+            'poly_ticker': pe.ticker,
+            'timestamp': datetime.now().isoformat()
+        }
+        self._rejected_queue.append((
+            None,  # No pair_id for rejected opportunities
+            ke.yes_price, ke.no_price,
+            pe.yes_price, pe.no_price,
+            ke.yes_price + pe.no_price,  # Example cost calculation
+            ke.no_price + pe.yes_price,
+            opp.profit_potential,
+            "REJECTED",
+            reason,
+            details
+        ))
+
+    def _flush_rejected_opportunities(self):
+        """Hand every queued rejection to the DB writer as one batch"""
+        pending = self._rejected_queue
+        if not pending:
+            return
+        batch = [pending.popleft() for _ in range(len(pending))]
         try:
-            # Use log_opportunity method (async via queue)
-            details = {
-                'type': opp.type,
-                'buy_side': opp.buy_side,
-                'kalshi_ticker': ke.ticker,
-                'poly_ticker': pe.ticker,
-                'timestamp': datetime.now().isoformat()
-            }
-
-            self.db_manager.log_opportunity(
-                pair_id=None,  # No pair_id for rejected opportunities
-                k_yes=ke.yes_price,
-                k_no=ke.no_price,
-                p_yes=pe.yes_price,
-                p_no=pe.no_price,
-                cost_a=ke.yes_price + pe.no_price,  # Example cost calculation
-                cost_b=ke.no_price + pe.yes_price,
-                profit=opp.profit_potential,
-                decision="REJECTED",
-                reason=reason,
-                details=details
-            )
-            logger.debug(f"[DASHBOARD] Logged rejected opportunity: {ke.ticker} (reason: {reason})")
+            self.db_manager.log_opportunities_bulk(batch)
+            logger.debug(f"[DASHBOARD] Logged {len(batch)} rejected opportunities")
         except Exception as e:
-            logger.error(f"Error logging rejected opportunity: {e}")
+            logger.error(f"Error logging rejected opportunities: {e}")
+
+    async def _rejected_flush_loop(self):
+        """Flush rejected opportunities to the DB every REJECTED_FLUSH_INTERVAL seconds"""
+        try:
+            while self.running:
+                await asyncio.sleep(self.REJECTED_FLUSH_INTERVAL)
+                self._flush_rejected_opportunities()
+                self.detector.flush_misses(force=False)  # Counts would otherwise wait for the next miss
+        finally:
+            self._flush_rejected_opportunities()
+
+    @staticmethod
+    def _shallow_event_dict(ev: MarketEvent) -> dict:
+        """Field-name -> value without asdict()'s recursive deep copy (the DB layer only json.dumps it)"""
+        return {f.name: getattr(ev, f.name) for f in dataclasses.fields(ev)}
+
+    async def _db_writer(self):
+        """Persistent consumer for _db_write_queue (one task for the bot's lifetime, not one per trade)"""
+        queue = self._db_write_queue
+        while True:
+            ke, pe = await queue.get()
+            try:
+                await self._async_register_market_pair(ke, pe)
+            except Exception as e:
+                logger.error(f"[OPT #13] DB writer error: {e}")
+            finally:
+                queue.task_done()
 
     async def _async_register_market_pair(self, ke: MarketEvent, pe: MarketEvent):
         """
         OPT #13: Async DB write for market pair registration.
-        Fire-and-forget task to avoid blocking execution path.
+        Run by _db_writer so the execution path never waits on it.
         """
         try:
-            k_dict = dataclasses.asdict(ke)
-            p_dict = dataclasses.asdict(pe)
-
-            # Run sync DB write in thread pool to avoid blocking event loop
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,  # Use default ThreadPoolExecutor
-                self.db_manager.register_market_pair,
+            k_dict = self._shallow_event_dict(ke)
+            p_dict = self._shallow_event_dict(pe)
+
+            # register_market_pair only hashes the tickers and queues the UPSERT for the DB
+            # writer thread, so it is called inline (no thread-pool hop)
+            self.db_manager.register_market_pair(
                 ke.ticker,
                 pe.ticker,
                 ke.title,
@@ -437,7 +588,7 @@ class ArbitrageBot:
                 k_dict,
                 p_dict
             )
-            logger.debug(f"[OPT #13] Async DB write completed for {ke.ticker}")
+            logger.debug(f"[OPT #13] DB write queued for {ke.ticker}")
         except Exception as e:
             logger.error(f"[OPT #13] Error in async DB write: {e}")
 
@@ -454,20 +605,26 @@ class ArbitrageBot:
             logger.info(f"Skipping Re-Execution for {cache_key} (Cooldown Active)")
             return
 
+        if opp.type == 'HARD':
+            self.detector.retain_opp(opp)  # Paired with release_opp in the finally below
         try:
             # Execute async (executor.execute_strategy is now async)
             executed = await self.executor.execute_strategy(opp)
 
             # Set cooldown for 1 minute AFTER ANY TRADE (success, fail, or simulation)
             self.market_cooldown_until = time.time() + self.TRADE_COOLDOWN
-            self.execution_history[cache_key] = time.time()
+            history = self.execution_history
+            history[cache_key] = time.time()
+            history.move_to_end(cache_key)
+            if len(history) > self.EXECUTION_HISTORY_MAX:
+                history.popitem(last=False)
 
             if executed is True:  # Only stop if trade was actually executed (not False or None)
                 logger.info(f"TRADE SUCCESSFULLY EXECUTED on {ke.ticker}!")
 
                 # OPT #13: Register market pair AFTER trade (async, non-blocking)
-                # Fire-and-forget DB write to avoid blocking execution
-                asyncio.create_task(self._async_register_market_pair(ke, pe))
+                # Handed to the persistent _db_writer task to avoid blocking execution
+                self._db_write_queue.put_nowait((ke, pe))
 
                 # OPTIMIZATION: Rediscover markets ONLY after trade completes
                 # Markets last 15 minutes, so we only need new markets after executing a trade
@@ -484,6 +641,17 @@ class ArbitrageBot:
             logger.error(f"Execution error: {e}")
             # Set cooldown even on error to prevent rapid retries
             self.market_cooldown_until = time.time() + self.TRADE_COOLDOWN
+        finally:
+            if opp.type == 'HARD':
+                self.detector.release_opp(opp)
+
+    async def _wait_or_stop(self, timeout: float = None) -> bool:
+        """Sleep up to `timeout` seconds (forever if None); returns True as soon as stop() is called"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
     async def run_websocket_mode(self):
         """Main loop using WebSocket feeds"""
@@ -498,12 +666,13 @@ class ArbitrageBot:
                 # Markets last 15 minutes - no need to check every 10s
                 # Check every 5 minutes instead
                 logger.warning("No matched pairs found. Retrying in 5 minutes (markets last 15min)...")
-                await asyncio.sleep(300)  # 5 minutes
+                await self._wait_or_stop(300)  # 5 minutes, cut short by stop()
 
         if not self.running:
             return  # Bot stopped during discovery
 
         self.locked_pairs = matched_pairs
+        self._index_locked_pairs()
 
         # Extract tickers and tokens for subscription
         kalshi_tickers = [ke.ticker for ke, _ in matched_pairs]
@@ -536,13 +705,13 @@ class ArbitrageBot:
         while self.running:
             try:
                 # Just keep the loop alive and let WebSocket callbacks handle everything
-                await asyncio.sleep(300)  # Sleep 5 minutes, just to keep loop responsive
+                await self._wait_or_stop()  # Returns the moment stop() sets the event
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in WebSocket loop: {e}")
-                await asyncio.sleep(5)
+                await self._wait_or_stop(5)
 
     async def run_rest_mode(self):
         """Fallback: REST polling mode (original implementation)"""
@@ -554,15 +723,15 @@ class ArbitrageBot:
 
                 # Dynamic polling interval
                 if self.locked_pairs:
-                    await asyncio.sleep(1)
+                    await self._wait_or_stop(1)
                 else:
-                    await asyncio.sleep(5)
+                    await self._wait_or_stop(5)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Runtime error in REST loop: {e}")
-                await asyncio.sleep(5)
+                await self._wait_or_stop(5)
 
     async def tick_rest(self):
         """Single tick of REST polling (converted to async)"""
@@ -575,24 +744,33 @@ class ArbitrageBot:
             logger.info(f"Targeting {len(self.locked_pairs)} Locked Pairs...")
 
             refreshed_locked = []
-            loop = asyncio.get_event_loop()
+            loop = self._loop or asyncio.get_running_loop()
+
+            # Refresh every locked pair concurrently (both legs of each pair in parallel too)
+            results = await asyncio.gather(
+                *(asyncio.gather(
+                    loop.run_in_executor(None, self.kalshi_feed.get_market, k_ev.event_id),
+                    loop.run_in_executor(None, self.poly_feed.get_market, p_ev.event_id)
+                ) for k_ev, p_ev in self.locked_pairs),
+                return_exceptions=True
+            )
 
-            for k_ev, p_ev in self.locked_pairs:
-                try:
-                    k_fresh = await loop.run_in_executor(None, self.kalshi_feed.get_market, k_ev.event_id)
-                    p_fresh = await loop.run_in_executor(None, self.poly_feed.get_market, p_ev.event_id)
-
-                    if k_fresh and p_fresh:
-                        now = datetime.now()
-                        if k_fresh.resolution_time > now and p_fresh.resolution_time > now:
-                            refreshed_locked.append((k_fresh, p_fresh))
-                        else:
-                            logger.info(f"Market Expired: {k_fresh.ticker}")
-                except Exception as e:
-                    logger.error(f"Refresh failed for {k_ev.ticker}: {e}")
+            now = datetime.now()
+            for (k_ev, p_ev), result in zip(self.locked_pairs, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Refresh failed for {k_ev.ticker}: {result}")
+                    continue
+
+                k_fresh, p_fresh = result
+                if k_fresh and p_fresh:
+                    if k_fresh.resolution_time > now and p_fresh.resolution_time > now:
+                        refreshed_locked.append((k_fresh, p_fresh))
+                    else:
+                        logger.info(f"Market Expired: {k_fresh.ticker}")
 
             if refreshed_locked:
                 self.locked_pairs = refreshed_locked
+                self._index_locked_pairs()
                 for ke, pe in self.locked_pairs:
                     # OPT #13: Skip DB write in REST mode hot path
                     # Will be written async if arbitrage is detected
@@ -601,10 +779,12 @@ class ArbitrageBot:
             else:
                 logger.info("All locked markets closed. Resuming search.")
                 self.locked_pairs = []
+                self._index_locked_pairs()
 
         if not self.locked_pairs:
             matched_pairs = await self.discover_markets()
             self.locked_pairs = matched_pairs
+            self._index_locked_pairs()
 
             for ke, pe in matched_pairs:
                 # OPT #13: Skip DB write in REST mode hot path
@@ -612,21 +792,24 @@ class ArbitrageBot:
                 pair_id = None
                 matched_pairs_with_id.append((ke, pe, pair_id))
 
-        # Check arbitrage for each pair
-        for ke, pe, pair_id in matched_pairs_with_id:
-            opp = self.detector.check_hard_arbitrage(ke, pe, pair_id)
-            if opp:
-                await self.execute_arbitrage(opp, ke, pe)
+        # Check arbitrage for all pairs in one batch scan
+        for opp, ke, pe in self.detector.scan_batch(matched_pairs_with_id):
+            await self.execute_arbitrage(opp, ke, pe)
 
     async def run_async(self):
         """Main async run loop"""
         self.running = True
+        self._stop_event.clear()
+        self._loop = asyncio.get_running_loop()
         logger.info("Bot started in ASYNC mode.")
 
         # FIX #2: Start background balance sync task
         balance_sync_task = asyncio.create_task(self.risk.start_background_sync())
         logger.info("[BACKGROUND SYNC] Task started")
 
+        rejected_flush_task = asyncio.create_task(self._rejected_flush_loop())
+        db_writer_task = asyncio.create_task(self._db_writer())
+
         try:
             if self.use_websockets:
                 await self.run_websocket_mode()
@@ -638,10 +821,20 @@ class ArbitrageBot:
             # Cancel background task
             self.risk.stop()
             balance_sync_task.cancel()
+            rejected_flush_task.cancel()
+
+            # Let queued pair registrations land before the DB is closed
             try:
-                await balance_sync_task
-            except asyncio.CancelledError:
-                pass
+                await asyncio.wait_for(self._db_write_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning(f"[OPT #13] {self._db_write_queue.qsize()} pair registrations not written")
+            db_writer_task.cancel()
+
+            for task in (balance_sync_task, rejected_flush_task, db_writer_task):
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
             await self.stop()
 
@@ -656,19 +849,22 @@ class ArbitrageBot:
         """Stop the bot and cleanup"""
         logger.info("Stopping bot...")
         self.running = False
+        self._stop_event.set()
 
         # Close WebSocket connections
         if hasattr(self, 'ws_manager'):
             await self.ws_manager.stop()
 
         # OPT #3: Close aiohttp sessions in feeds
-        if hasattr(self, 'execution_coordinator'):
+        if hasattr(self, 'executor'):
             try:
-                await self.execution_coordinator.close_async_sessions()
+                await self.executor.close_async_sessions()
             except Exception as e:
                 logger.error(f"Error closing async sessions: {e}")
 
-        # Close database
+        # Close database (pending miss counts first, so they're in the final drain)
+        if hasattr(self, 'detector'):
+            self.detector.flush_misses()
         if hasattr(self, 'db_manager'):
             self.db_manager.close()
 
@@ -7,13 +7,14 @@ try:
 except ImportError:
     load_dotenv = None
 
-@dataclass
+# Loaded once and never mutated: frozen + slots gives fixed-offset attribute access, no __dict__
+@dataclass(frozen=True, slots=True)
 class RiskConfig:
     max_risk_per_trade: float = 0.90  # 90% of bankroll (Enabled for small account trading)
     max_daily_loss: float = 0.20      # 20% of bankroll
     max_net_exposure: float = 0.50    # 50% of bankroll
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FeeConfig:
     kalshi_maker_rate: float = 0.01   # 1%
     kalshi_taker_rate: float = 0.01   # 1%
@@ -40,17 +41,28 @@ class ConfigManager:
         self.KALSHI_API_KEY: Optional[str] = os.getenv("KALSHI_API_KEY")
         self.KALSHI_API_SECRET: Optional[str] = os.getenv("KALSHI_API_SECRET")
         self.POLYMARKET_API_KEY: Optional[str] = os.getenv("POLYMARKET_API_KEY")
+
+        # Opt-in ("db_fast_mode": true in config.json): SQLite PRAGMA synchronous=OFF, no fsync at all.
+        # An OS crash / power loss can corrupt the DB, including daily_risk_metrics in the same file,
+        # so only enable it for disposable simulation telemetry (delete arbitrage_bot.db to rebuild).
+        self.db_fast_mode: bool = self._config.get("db_fast_mode", False)
         
-        self.risk_config = RiskConfig(
-            max_risk_per_trade=self._config.get("max_risk_per_trade", RiskConfig.max_risk_per_trade),
-            max_daily_loss=self._config.get("max_daily_loss", RiskConfig.max_daily_loss),
-            max_net_exposure=self._config.get("max_net_exposure", RiskConfig.max_net_exposure)
-        )
+        # Only pass keys present in config: with slots=True the class attributes are member
+        # descriptors, not the field defaults, so RiskConfig.max_risk_per_trade can't be a fallback
+        self.risk_config = RiskConfig(**self._pick({
+            "max_risk_per_trade": "max_risk_per_trade",
+            "max_daily_loss": "max_daily_loss",
+            "max_net_exposure": "max_net_exposure",
+        }))
         
-        self.fee_config = FeeConfig(
-            kalshi_maker_rate=self._config.get("fee_kalshi", FeeConfig.kalshi_maker_rate),
-            poly_flat_fee=self._config.get("fee_poly", FeeConfig.poly_flat_fee)
-        )
+        self.fee_config = FeeConfig(**self._pick({
+            "kalshi_maker_rate": "fee_kalshi",
+            "poly_flat_fee": "fee_poly",
+        }))
+
+    def _pick(self, fields: Dict[str, str]) -> Dict[str, Any]:
+        """Maps dataclass field -> config key, keeping only keys set in config."""
+        return {field: self._config[key] for field, key in fields.items() if key in self._config}
 
     def _load_config(self):
         """Loads config from file if exists, otherwise uses defaults."""
@@ -76,3 +88,8 @@ class ConfigManager:
 
 # Global instance
 config = ConfigManager()
+
+# Resolved once at import for hot paths: one module global load instead of config.x.y chains
+SIMULATION_MODE: bool = config.SIMULATION_MODE
+RISK: RiskConfig = config.risk_config
+FEES: FeeConfig = config.fee_config
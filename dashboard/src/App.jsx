@@ -4,6 +4,14 @@ import MarketPairing from './MarketPairing'
 
 const API_URL = 'http://localhost:5000/api'
 
+// /opportunities and /trades return {columns: [...], rows: [[...], ...]}; rebuild row objects
+const fromColumns = ({ columns = [], rows = [] }, extra = {}) =>
+  rows.map(row => {
+    const obj = { ...extra }
+    columns.forEach((col, i) => { obj[col] = row[i] })
+    return obj
+  })
+
 function App() {
   const [currentPage, setCurrentPage] = useState('dashboard') // 'dashboard' or 'pairing'
   const [status, setStatus] = useState(null)
@@ -34,8 +42,9 @@ function App() {
 
       const statusData = await statusRes.json()
       const marketsData = (await marketsRes.json()).markets || []
-      const oppsData = (await oppsRes.json()).opportunities || []
-      const tradesData = (await tradesRes.json()).trades || []
+      const oppsJson = await oppsRes.json()
+      const oppsData = fromColumns(oppsJson, { simulated: oppsJson.simulated })
+      const tradesData = fromColumns(await tradesRes.json())
       const statsData = await statsRes.json()
       const logsData = (await logsRes.json()).logs || []
 
@@ -217,8 +226,6 @@ function App() {
                     {paginatedOpps.map((opp) => {
                       const date = new Date(opp.timestamp)
                       const executionStatus = opp.decision === 'REJECTED' ? 'REJECTED' : (opp.simulated ? 'SIMULATED' : 'EXECUTED')
-                      const volumes = opp.volumes || { total: 0, kalshi: 0, polymarket: 0 }
-                      const prices = opp.prices || { kalshi_yes: 0, kalshi_no: 0, poly_yes: 0, poly_no: 0 }
 
                       // Determine which price was used based on strategy
                       const strategy = opp.strategy || 'N/A'
@@ -226,11 +233,11 @@ function App() {
                       let polyPrice = 0
 
                       if (strategy === 'YES_K_NO_P') {
-                        kalshiPrice = prices.kalshi_yes
-                        polyPrice = prices.poly_no
+                        kalshiPrice = opp.kalshi_yes || 0
+                        polyPrice = opp.poly_no || 0
                       } else if (strategy === 'NO_K_YES_P') {
-                        kalshiPrice = prices.kalshi_no
-                        polyPrice = prices.poly_yes
+                        kalshiPrice = opp.kalshi_no || 0
+                        polyPrice = opp.poly_yes || 0
                       }
 
                       return (
@@ -258,9 +265,9 @@ function App() {
                           <td className="profit">{(opp.profit * 100).toFixed(2)}%</td>
                           <td className="price">${kalshiPrice.toFixed(2)}</td>
                           <td className="price">${polyPrice.toFixed(2)}</td>
-                          <td className="volume">${volumes.total.toFixed(2)}</td>
-                          <td className="volume">${volumes.kalshi.toFixed(2)}</td>
-                          <td className="volume">${volumes.polymarket.toFixed(2)}</td>
+                          <td className="volume">${(opp.volume_total || 0).toFixed(2)}</td>
+                          <td className="volume">${(opp.volume_kalshi || 0).toFixed(2)}</td>
+                          <td className="volume">${(opp.volume_polymarket || 0).toFixed(2)}</td>
                           <td className="reason" title={opp.reason}>
                             {opp.decision === 'REJECTED' ? (
                               <span>{opp.reason?.substring(0, 30) || 'N/A'}</span>
@@ -1,248 +1,503 @@
 
 import sqlite3
 import json
+import time
+import hashlib
 from datetime import datetime
 from typing import Optional
 import logging
 import threading
-import queue
 import dataclasses
+from collections import deque, namedtuple
+from pathlib import Path
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger("DatabaseManager")
 
+
+if orjson:
+    def _dumps(obj) -> str:
+        """JSON text for a details/raw dict (orjson; datetimes still go through str() like json.dumps(default=str))"""
+        return orjson.dumps(obj, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS).decode()
+else:
+    def _dumps(obj) -> str:
+        """JSON text for a details/raw dict"""
+        return json.dumps(obj, default=str)
+
+INSERT_OPPORTUNITY_SQL = """
+    INSERT INTO opportunities (
+        market_pair_id, price_kalshi_yes, price_kalshi_no, price_poly_yes, price_poly_no,
+        cost_a, cost_b, net_profit_best, decision, reason, details_json
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Written by the worker with a precomputed id (see pair_id_for): insert, or touch last_seen of the
+# existing (kalshi_ticker, poly_ticker) row
+UPSERT_MARKET_PAIR_SQL = """
+    INSERT INTO matched_markets (
+        id, kalshi_ticker, poly_ticker, title, resolution_time,
+        kalshi_id, poly_id, poly_title, kalshi_raw_json, poly_raw_json
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(kalshi_ticker, poly_ticker) DO UPDATE SET last_seen = CURRENT_TIMESTAMP
+"""
+
+INSERT_MISS_SQL = "INSERT INTO opportunity_misses (market_pair_id, miss_count) VALUES (?, ?)"
+
+TOUCH_MARKET_SQL = "UPDATE matched_markets SET last_seen = CURRENT_TIMESTAMP WHERE id = ?"
+
+UPSERT_RISK_STATE_SQL = """
+    INSERT INTO daily_risk_metrics (date, daily_pnl, current_exposure, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(date) DO UPDATE SET
+        daily_pnl=excluded.daily_pnl,
+        current_exposure=excluded.current_exposure,
+        updated_at=CURRENT_TIMESTAMP
+"""
+
+PAIR_ID_MASK = (1 << 53) - 1  # Deterministic pair ids stay exact as JSON/JS numbers
+
+# Positional hard-arb row from ArbitrageDetector: the first 10 fields bind straight to the
+# opportunities INSERT, the fee fields are folded into details_json by the writer thread.
+HardArbRecord = namedtuple(
+    'HardArbRecord',
+    'pair_id k_yes k_no p_yes p_no cost_a cost_b profit decision reason '
+    'fee_poly fee_kalshi fees_a fees_b best_side'
+)
+
 class DatabaseManager:
-    def __init__(self, db_path="arbitrage_bot.db"):
+    WRITE_BATCH_MAX = 500  # Max queued writes applied per transaction by the worker
+    WRITE_BUFFER_MAX = 50_000  # Pending telemetry writes kept under backpressure; oldest are dropped beyond this
+    # Low-value writes that may be shed under backpressure; market/hard-arb writes never are
+    TELEMETRY_EVENTS = frozenset(('opportunity', 'opportunity_batch', 'miss_batch'))
+    SCHEMA_VERSION = 1  # PRAGMA user_version once _create_schema has run
+    COALESCE_WINDOW = 0.5  # Seconds an identical (prices, decision) row for a pair is suppressed
+    CLOSE_TIMEOUT = 5.0  # Max seconds close() waits for the worker's final drain
+
+    def __init__(self, db_path="arbitrage_bot.db", fast_mode: bool = False):
         self.db_path = db_path
+        self.fast_mode = fast_mode  # synchronous=OFF (see ConfigManager.db_fast_mode)
+        # One long-lived connection per thread (see _conn); all of them are closed in close()
+        self._tls = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+
+        # In-Memory Cache for Pair IDs (K_Ticker, P_Ticker) -> ID (preloaded by _init_db)
+        self.pair_id_cache = {}
         self._init_db()
         
         # Async Writing Setup
-        self.write_queue = queue.Queue()
+        # deque.append is atomic under the GIL: producers never take a lock, the worker drains in bulk
+        self.write_buffer = deque()  # Market, hard-arb and control writes: never dropped
+        self.telemetry_buffer = deque()  # TELEMETRY_EVENTS: bounded by WRITE_BUFFER_MAX
+        self._write_wake = threading.Event()
+        self.dropped = 0  # Telemetry writes discarded because the worker fell WRITE_BUFFER_MAX behind
+        self._last_logged = {}  # pair_id -> ((k_yes, k_no, p_yes, p_no, decision), monotonic ts)
+        self.coalesced = 0  # Rows skipped as repeats within COALESCE_WINDOW
         self.running = True
         self.worker_thread = threading.Thread(target=self._worker, daemon=True)
         self.worker_thread.start()
-        
-        # In-Memory Cache for Pair IDs (K_Ticker, P_Ticker) -> ID
-        self.pair_id_cache = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the per-connection PRAGMAs applied (journal_mode=WAL is set once in _init_db)."""
+        # Persistent connections + constant SQL strings: each statement is prepared once per connection
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        if self.fast_mode:
+            conn.execute("PRAGMA synchronous=OFF")   # No fsync; DB may corrupt on OS crash (sim telemetry only)
+        else:
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: crash-safe, no fsync per commit
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")     # 64 MiB page cache
+        conn.execute("PRAGMA mmap_size=268435456")   # 256 MiB memory-mapped reads
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's persistent connection (opened and PRAGMA-configured once, reused for every call)."""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = self._tls.conn = self._connect()
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _ro_conn(self) -> sqlite3.Connection:
+        """This thread's read-only connection for read APIs (under WAL it never contends with the writer)."""
+        conn = getattr(self._tls, 'ro_conn', None)
+        if conn is None:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = self._tls.ro_conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA mmap_size=268435456")
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
 
     def _init_db(self):
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
+
+            # WAL is persistent in the DB file: readers (api_server) no longer block the writer thread
+            cursor.execute("PRAGMA journal_mode=WAL")
             
-            # Table: Matched Markets
-            # Expanded Schema
-            # Checking if table needs migration is complex in simple script.
-            # Ideally, user should delete old DB or we handle "add column"
-            # For simplicity, we create with new schema. if exists, we might error on missing cols if we don't migrate.
-            # Let's try to add columns if they don't exist (Migration)
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS matched_markets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    kalshi_ticker TEXT NOT NULL,
-                    poly_ticker TEXT NOT NULL,
-                    title TEXT,
-                    resolution_time DATETIME,
-                    kalshi_opened_at DATETIME, 
-                    kalshi_closed_at DATETIME, 
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    
-                    -- New Columns
-                    kalshi_id TEXT,
-                    poly_id TEXT,
-                    poly_title TEXT,
-                    kalshi_raw_json TEXT,
-                    poly_raw_json TEXT,
-                    
-                    UNIQUE(kalshi_ticker, poly_ticker)
-                )
-            """)
-            
-            # Migration check (naive)
-            # Check if 'kalshi_id' exists
-            cursor.execute("PRAGMA table_info(matched_markets)")
-            columns = [info[1] for info in cursor.fetchall()]
-            if 'kalshi_id' not in columns:
-                logger.info("Migrating DB: Adding new columns to matched_markets...")
+            # Schema body only runs when the file is behind SCHEMA_VERSION, in one transaction:
+            # a crash mid-migration rolls back and the next start simply retries it
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+            if version < self.SCHEMA_VERSION:
+                logger.info(f"Migrating DB schema v{version} -> v{self.SCHEMA_VERSION}...")
+                cursor.execute("BEGIN")
                 try:
-                    cursor.execute("ALTER TABLE matched_markets ADD COLUMN kalshi_id TEXT")
-                    cursor.execute("ALTER TABLE matched_markets ADD COLUMN poly_id TEXT")
-                    cursor.execute("ALTER TABLE matched_markets ADD COLUMN poly_title TEXT")
-                    cursor.execute("ALTER TABLE matched_markets ADD COLUMN kalshi_raw_json TEXT")
-                    cursor.execute("ALTER TABLE matched_markets ADD COLUMN poly_raw_json TEXT")
-                except Exception as e:
-                    logger.warning(f"Migration partial error (continuing): {e}")
-
-            # Table: Opportunities
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS opportunities (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    market_pair_id INTEGER NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    
-                    price_kalshi_yes REAL,
-                    price_kalshi_no REAL,
-                    price_poly_yes REAL,
-                    price_poly_no REAL,
-                    
-                    cost_a REAL,
-                    cost_b REAL,
-                    
-                    net_profit_best REAL,
-                    decision TEXT, 
-                    reason TEXT,
-                    
-                    details_json TEXT,
-                    
-                    FOREIGN KEY(market_pair_id) REFERENCES matched_markets(id)
-                )
-            """)
-
-            # Table: Daily Risk Metrics (SRE Fix)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_risk_metrics (
-                    date DATE PRIMARY KEY,
-                    daily_pnl REAL DEFAULT 0.0,
-                    current_exposure REAL DEFAULT 0.0,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                    self._create_schema(cursor)
+                    cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            # Pairs registered before ids became deterministic keep their stored (autoincrement) id
+            cursor.execute("SELECT kalshi_ticker, poly_ticker, id FROM matched_markets")
+            self.pair_id_cache.update(((k, p), pair_id) for k, p, pair_id in cursor.fetchall())
 
-            
-            conn.commit()
             conn.close()
             logger.info("Database initialized successfully (Async Mode).")
         except Exception as e:
             logger.error(f"Database Initialization Failed: {e}")
 
-    def _worker(self):
-        """Background thread to process DB writes."""
-        while self.running:
-            try:
-                task = self.write_queue.get(timeout=1) # check running every 1s
-                event_type, data = task
+    def _create_schema(self, cursor):
+        """Create tables/indexes and migrate older layouts (idempotent; run by _init_db inside a transaction)."""
+        # Table: Matched Markets
+        # Expanded Schema
+        # Checking if table needs migration is complex in simple script.
+        # Ideally, user should delete old DB or we handle "add column"
+        # For simplicity, we create with new schema. if exists, we might error on missing cols if we don't migrate.
+        # Let's try to add columns if they don't exist (Migration)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS matched_markets (
+                id INTEGER PRIMARY KEY,  -- pair_id_for(kalshi_ticker, poly_ticker) on new rows
+                kalshi_ticker TEXT NOT NULL,
+                poly_ticker TEXT NOT NULL,
+                title TEXT,
+                resolution_time DATETIME,
+                kalshi_opened_at DATETIME, 
+                kalshi_closed_at DATETIME, 
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                
+                -- New Columns
+                kalshi_id TEXT,
+                poly_id TEXT,
+                poly_title TEXT,
+                kalshi_raw_json TEXT,
+                poly_raw_json TEXT,
+                last_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
                 
-                if event_type == 'close':
-                    break
+                UNIQUE(kalshi_ticker, poly_ticker)
+            )
+        """)
+        
+        # Migration for tables created by older versions
+        cursor.execute("PRAGMA table_info(matched_markets)")
+        columns = [info[1] for info in cursor.fetchall()]
+        # Per-column check: a half-migrated table just gets the missing ones
+        for col in ('kalshi_id', 'poly_id', 'poly_title', 'kalshi_raw_json', 'poly_raw_json'):
+            if col not in columns:
+                logger.info(f"Migrating DB: Adding {col} to matched_markets...")
+                cursor.execute(f"ALTER TABLE matched_markets ADD COLUMN {col} TEXT")
+
+        if 'last_seen' not in columns:
+            # ALTER TABLE can't use a CURRENT_TIMESTAMP default; existing rows fall back to created_at
+            logger.info("Migrating DB: Adding last_seen to matched_markets...")
+            cursor.execute("ALTER TABLE matched_markets ADD COLUMN last_seen DATETIME")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_mm_last_seen ON matched_markets(last_seen DESC)")
+
+        # Table: Opportunities
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS opportunities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                market_pair_id INTEGER NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                 
-                self._perform_insert(event_type, data)
-                self.write_queue.task_done()
+                price_kalshi_yes REAL,
+                price_kalshi_no REAL,
+                price_poly_yes REAL,
+                price_poly_no REAL,
                 
-            except queue.Empty:
-                continue
-            except Exception as e:
-                logger.error(f"DB Worker Error: {e}")
+                cost_a REAL,
+                cost_b REAL,
+                
+                net_profit_best REAL,
+                decision TEXT, 
+                reason TEXT,
+                
+                details_json TEXT,
+                
+                FOREIGN KEY(market_pair_id) REFERENCES matched_markets(id)
+            )
+        """)
 
-    def _perform_insert(self, event_type, data):
-        conn = None
+        # Indexes for dashboard queries (ORDER BY timestamp DESC + JOIN on market_pair_id).
+        # (market_pair_id, timestamp) also serves "last N opportunities for this pair" and
+        # supersedes the old single-column market_pair_id index.
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_opp_ts ON opportunities(timestamp DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_opp_pair_ts ON opportunities(market_pair_id, timestamp)")
+        cursor.execute("DROP INDEX IF EXISTS idx_opp_mpid")
+
+        # Table: Opportunity Misses (aggregated NO BUY counts per pair, flushed by ArbitrageDetector)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS opportunity_misses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                market_pair_id INTEGER NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                miss_count INTEGER,
+                
+                FOREIGN KEY(market_pair_id) REFERENCES matched_markets(id)
+            )
+        """)
+
+        # Table: Daily Risk Metrics (SRE Fix)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_risk_metrics (
+                date DATE PRIMARY KEY,
+                daily_pnl REAL DEFAULT 0.0,
+                current_exposure REAL DEFAULT 0.0,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def _worker(self):
+        """Background thread to process DB writes.
+
+        Drains up to WRITE_BATCH_MAX queued writes at a time and applies them on one long-lived
+        connection in a single transaction (one commit/fsync per batch instead of per row).
+        Market/hard-arb writes are taken before telemetry, so pair rows land ahead of their opportunities.
+        """
+        buf = self.write_buffer
+        tele = self.telemetry_buffer
+        wake = self._write_wake
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+            # Owned by the worker alone (not registered in _conns): close() never closes it under a
+            # worker that is still draining; the worker closes it after the final flush + checkpoint
+            conn = self._connect()
+            closing = False
+            while True:
+                if not buf and not tele:
+                    if closing:
+                        break
+                    wake.wait()  # Sleeps until _enqueue or close() signals; no idle polling
+                    wake.clear()  # buf is re-checked after clearing, so a racing append is never lost
+                    continue
+
+                batch = []
+                while buf and len(batch) < self.WRITE_BATCH_MAX:
+                    item = buf.popleft()
+                    if item[0] == 'close':
+                        # Drain-before-exit: keep flushing whatever is still buffered, then stop
+                        closing = True
+                        continue
+                    batch.append(item)
+                while tele and len(batch) < self.WRITE_BATCH_MAX:
+                    batch.append(tele.popleft())
+
+                try:
+                    if batch:
+                        self._write_batch(conn, batch)
+                except Exception as e:
+                    logger.error(f"DB Worker Error: {e}")
+
+            # Fold the WAL back into the main file so it doesn't keep growing across restarts
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception as e:
+                logger.warning(f"WAL checkpoint on close failed: {e}")
+            conn.close()
+        except Exception as e:
+            logger.error(f"DB Worker Error: {e}")
+
+    def _enqueue(self, item: tuple):
+        """Hand a write to the worker: lock-free append, Event.set only if the worker isn't already woken."""
+        if item[0] in self.TELEMETRY_EVENTS:
+            buf = self.telemetry_buffer
+            if len(buf) >= self.WRITE_BUFFER_MAX:
+                # Backpressure: shed the oldest pending telemetry instead of growing without bound
+                try:
+                    buf.popleft()
+                except IndexError:
+                    pass  # Worker drained it meanwhile
+                else:
+                    self.dropped += 1
+                    if self.dropped % 10_000 == 1:
+                        logger.warning(f"DB telemetry buffer full: dropped {self.dropped} writes so far")
+        else:
+            buf = self.write_buffer
+        buf.append(item)
+        if not self._write_wake.is_set():
+            self._write_wake.set()
+
+    def _write_batch(self, conn, batch):
+        """Apply a batch of queued writes in one transaction; opportunity rows go through one executemany."""
+        opp_rows = []
+        others = []
+        for event_type, data in batch:
             if event_type == 'opportunity':
-                cursor.execute("""
-                    INSERT INTO opportunities (
-                        market_pair_id, price_kalshi_yes, price_kalshi_no, price_poly_yes, price_poly_no,
-                        cost_a, cost_b, net_profit_best, decision, reason, details_json
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, data)
-                
-            elif event_type == 'insert_market':
-                # Only used if we want async market insert. 
-                # But we do sync cache check.
-                # If we do async insert, we can't get ID easily for the cache update unless we re-query.
-                # Currently register_market_pair is mostly SYNC for ID retrieval.
-                pass
-                
-            conn.commit()
+                opp_rows.append(self._opportunity_row(data))
+            elif event_type == 'opportunity_batch':
+                opp_rows.extend([self._opportunity_row(row) for row in data])
+            elif event_type == 'hard_arb':
+                opp_rows.append(self._hard_arb_row(data))
+            else:
+                others.append((event_type, data))
+
+        try:
+            with conn:
+                cursor = conn.cursor()
+                for event_type, data in others:  # Pair rows land before the opportunities pointing at them
+                    self._perform_insert(cursor, event_type, data)
+                if opp_rows:
+                    cursor.executemany(INSERT_OPPORTUNITY_SQL, opp_rows)
         except Exception as e:
-            logger.error(f"Insert Failed ({event_type}): {e}")
-        finally:
-            if conn:
-                conn.close()
+            # Rolled back as a whole; retry row by row so one bad row doesn't drop the batch
+            logger.warning(f"Batch insert failed ({len(batch)} writes), retrying individually: {e}")
+            for event_type, data in batch:
+                try:
+                    with conn:
+                        self._perform_insert(conn.cursor(), event_type, data)
+                except Exception as e:
+                    logger.error(f"Insert Failed ({event_type}): {e}")
+
+    @staticmethod
+    def _opportunity_row(data: tuple) -> tuple:
+        """opportunities row for a queued log_opportunity tuple (details dict serialized here, on the worker)"""
+        return data[:10] + (_dumps(data[10]),)
+
+    @staticmethod
+    def _hard_arb_row(data: HardArbRecord) -> tuple:
+        """opportunities row for a HardArbRecord (fee fields folded into details_json)"""
+        details = {
+            "fee_rate_poly": data.fee_poly,
+            "fee_rate_kalshi": data.fee_kalshi,
+            "fees_a": data.fees_a,
+            "fees_b": data.fees_b,
+            "best_side": data.best_side
+        }
+        return data[:10] + (_dumps(details),)
+
+    def _perform_insert(self, cursor, event_type, data):
+        if event_type == 'opportunity':
+            cursor.execute(INSERT_OPPORTUNITY_SQL, self._opportunity_row(data))
+
+        elif event_type == 'opportunity_batch':
+            cursor.executemany(INSERT_OPPORTUNITY_SQL, [self._opportunity_row(row) for row in data])
+
+        elif event_type == 'hard_arb':
+            cursor.execute(INSERT_OPPORTUNITY_SQL, self._hard_arb_row(data))
+
+        elif event_type == 'miss_batch':
+            cursor.executemany(INSERT_MISS_SQL, data)
+
+        elif event_type == 'touch_market':
+            cursor.execute(TOUCH_MARKET_SQL, data)
+
+        elif event_type == 'insert_market':
+            # (pair_id, k_ticker, p_ticker, k_title, res_time, k_id, p_id, p_title, k_raw, p_raw)
+            k_json = _dumps(data[8]) if data[8] else None
+            p_json = _dumps(data[9]) if data[9] else None
+            cursor.execute(UPSERT_MARKET_PAIR_SQL, data[:8] + (k_json, p_json))
+
+    @staticmethod
+    def pair_id_for(k_ticker: str, p_ticker: str) -> int:
+        """
+        Deterministic matched_markets id for a ticker pair (BLAKE2b prefix).
+        Masked to 53 bits so it survives the JSON round-trip to the dashboard.
+        """
+        digest = hashlib.blake2b(f"{k_ticker}\x00{p_ticker}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') & PAIR_ID_MASK
 
     def register_market_pair(self, k_ticker: str, p_ticker: str, k_title: str, res_time: datetime,
                              k_id: str = None, p_id: str = None, p_title: str = None,
                              k_raw: dict = None, p_raw: dict = None) -> Optional[int]:
         """
         Registers a matched pair. 
-        Synchronous check/insert ensures we get the ID immediately for the loop.
-        Optimization: Uses In-Memory Cache to avoid DB Query on every tick.
+        The ID is derived from the tickers, so it is returned immediately; the row itself is
+        UPSERTed by the writer thread (no DB round-trip on the caller).
+        Optimization: Uses In-Memory Cache to skip the insert for pairs already seen.
         """
         cache_key = (k_ticker, p_ticker)
-        if cache_key in self.pair_id_cache:
-            return self.pair_id_cache[cache_key]
-            
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check existence first
-            cursor.execute("SELECT id FROM matched_markets WHERE kalshi_ticker = ? AND poly_ticker = ?", (k_ticker, p_ticker))
-            row = cursor.fetchone()
-            
-            if row:
-                pair_id = row[0]
-                # Update Cache
-                self.pair_id_cache[cache_key] = pair_id
-                conn.close()
-                return pair_id
-            
-            # Insert (Sync)
-            # Serialize JSON
-            k_json = json.dumps(k_raw, default=str) if k_raw else None
-            p_json = json.dumps(p_raw, default=str) if p_raw else None
-            
-            cursor.execute("""
-                INSERT INTO matched_markets (
-                    kalshi_ticker, poly_ticker, title, resolution_time,
-                    kalshi_id, poly_id, poly_title, kalshi_raw_json, poly_raw_json
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (k_ticker, p_ticker, k_title, res_time, k_id, p_id, p_title, k_json, p_json))
-            
-            pair_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            
-            self.pair_id_cache[cache_key] = pair_id
+        pair_id = self.pair_id_cache.get(cache_key)
+        if pair_id is not None:
+            self._enqueue(('touch_market', (pair_id,)))
             return pair_id
-            
-        except Exception as e:
-            logger.error(f"Failed to register market pair: {e}")
-            return None
+
+        pair_id = self.pair_id_cache[cache_key] = self.pair_id_for(k_ticker, p_ticker)
+        self._enqueue(('insert_market', (
+            pair_id, k_ticker, p_ticker, k_title, res_time, k_id, p_id, p_title, k_raw, p_raw
+        )))
+        return pair_id
 
     def log_opportunity(self, pair_id: int, k_yes: float, k_no: float, p_yes: float, p_no: float, 
                         cost_a: float, cost_b: float, profit: float, decision: str, reason: str, details: dict):
         """
-        Asynchronous logging. Pushes to queue.
+        Asynchronous logging. Pushes to queue; `details` is JSON-encoded by the writer thread.
         """
+        if self._is_repeat(pair_id, (k_yes, k_no, p_yes, p_no, decision)):
+            return
         data = (
             pair_id, k_yes, k_no, p_yes, p_no,
-            cost_a, cost_b, profit, decision, reason, json.dumps(details, default=str)
+            cost_a, cost_b, profit, decision, reason, details
         )
-        self.write_queue.put(('opportunity', data))
+        self._enqueue(('opportunity', data))
+
+    def log_opportunities_bulk(self, rows: list):
+        """
+        Asynchronous logging of many opportunities in one transaction.
+        Each row has log_opportunity's argument order: (pair_id, k_yes, k_no, p_yes, p_no,
+        cost_a, cost_b, profit, decision, reason, details). Details are JSON-encoded by the writer thread.
+        """
+        if rows:
+            self._enqueue(('opportunity_batch', list(rows)))
+
+    def log_hard_arb(self, record: HardArbRecord):
+        """
+        Asynchronous logging of a HardArbRecord. No dict/JSON work on the caller's thread.
+        """
+        if self._is_repeat(record.pair_id, (record.k_yes, record.k_no, record.p_yes, record.p_no, record.decision)):
+            return
+        self._enqueue(('hard_arb', record))
+
+    def _is_repeat(self, pair_id, key: tuple) -> bool:
+        """True if this pair logged the same prices/decision less than COALESCE_WINDOW ago (row is skipped)."""
+        now = time.monotonic()
+        last = self._last_logged.get(pair_id)
+        if last is not None and last[0] == key and now - last[1] < self.COALESCE_WINDOW:
+            self.coalesced += 1
+            return True
+        self._last_logged[pair_id] = (key, now)  # Single dict store: atomic under the GIL
+        return False
+
+    def log_miss_batch(self, counts: dict):
+        """
+        Asynchronous logging of aggregated misses ({pair_id: count}).
+        """
+        if counts:
+            self._enqueue(('miss_batch', list(counts.items())))
 
     def save_risk_state(self, daily_pnl: float, current_exposure: float):
         """
         Saves current risk metrics to DB (Upsert for today).
         """
         today = datetime.now().date().isoformat()
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn()
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO daily_risk_metrics (date, daily_pnl, current_exposure, updated_at)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(date) DO UPDATE SET
-                    daily_pnl=excluded.daily_pnl,
-                    current_exposure=excluded.current_exposure,
-                    updated_at=CURRENT_TIMESTAMP
-            """, (today, daily_pnl, current_exposure))
+            cursor.execute(UPSERT_RISK_STATE_SQL, (today, daily_pnl, current_exposure))
             conn.commit()
-            conn.close()
         except Exception as e:
             logger.error(f"Failed to save risk state: {e}")
+            if conn:
+                conn.rollback()
 
     def load_risk_state(self) -> dict:
         """
@@ -250,11 +505,9 @@ class DatabaseManager:
         """
         today = datetime.now().date().isoformat()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._ro_conn().cursor()
             cursor.execute("SELECT daily_pnl, current_exposure FROM daily_risk_metrics WHERE date = ?", (today,))
             row = cursor.fetchone()
-            conn.close()
             if row:
                 return {"daily_pnl": row[0], "current_exposure": row[1]}
         except Exception as e:
@@ -264,7 +517,19 @@ class DatabaseManager:
 
     def close(self):
         self.running = False
-        self.write_queue.put(('close', None))
+        self._enqueue(('close', None))
+        self._write_wake.set()  # Wake the worker even if the event was already set and cleared meanwhile
         if self.worker_thread.is_alive():
-            self.worker_thread.join(timeout=2)
+            # Bounded: the worker flushes everything still buffered before exiting
+            self.worker_thread.join(timeout=self.CLOSE_TIMEOUT)
+            if self.worker_thread.is_alive():
+                logger.warning(f"DB worker still flushing after {self.CLOSE_TIMEOUT}s; {len(self.write_buffer) + len(self.telemetry_buffer)} writes pending")
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Error closing DB connection: {e}")
+        self._tls = threading.local()
         logger.info("Database Worker Stopped.")
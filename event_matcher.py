@@ -1,19 +1,92 @@
+import re
 from datetime import timedelta
-from difflib import SequenceMatcher
-from typing import Optional
+from functools import lru_cache
+from typing import NamedTuple, Optional
 from market_data import MarketEvent
 from market_data import MarketEvent
 from logger import logger
 
+# Dollar amounts like "$99,750" / "above 3,500.50"; compiled once instead of per title
+_STRIKE_RE = re.compile(r'(?:above|below|>|<)?\s?\$?([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]+)?)')
+_STRIP_COMMAS = str.maketrans('', '', ',')
+
+# Assets as bits, so "share an asset" is one integer AND instead of a set intersection
+ASSET_BTC, ASSET_ETH, ASSET_SOL = 1, 2, 4
+_ASSET_NAMES = {ASSET_BTC: "btc", ASSET_ETH: "eth", ASSET_SOL: "sol"}
+
+# Asset keyword -> asset bit; adding a coin is one entry here (plus its bit above)
+_ASSET_MAP = {
+    "bitcoin": ASSET_BTC, "btc": ASSET_BTC,
+    "ethereum": ASSET_ETH, "eth": ASSET_ETH,
+    "solana": ASSET_SOL, "sol": ASSET_SOL,
+}
+_ASSET_RE = re.compile(r'\b(' + '|'.join(_ASSET_MAP) + r')\b')
+
+_TOKEN_SPLIT_RE = re.compile(r'\W+')
+_UPDOWN_TOKENS = frozenset(("up", "down"))
+
+
+def _extract_strike(title: str) -> Optional[float]:
+    # Look for patterns like $99,750, 99.75k? No, usually just numbers in Kalshi.
+    # Pattern: "above <number>" or "$<number>"
+    # Filter out small numbers implies 15 mins? 
+    # We want large numbers (price). E.g. > 1000.
+    for m in _STRIKE_RE.findall(title):
+        val = float(m.translate(_STRIP_COMMAS))  # Group only matches digits/commas/one dot: can't raise
+        if val > 500: # BTC/ETH prices usually > 500
+            return val
+    return None
+
+
+def _extract_assets(text: str) -> int:
+    # `text` must already be lowercased (TitleFingerprint.title_lc); no second lower() copy here.
+    # One regex pass over the title instead of six substring scans; word
+    # boundaries keep "sol" in "resolve" or "eth" in "method" from tagging an asset
+    mask = 0
+    for m in _ASSET_RE.findall(text):
+        mask |= _ASSET_MAP[m]
+    return mask
+
+
+class TitleFingerprint(NamedTuple):
+    """Everything are_equivalent needs from a title, derived once per distinct title."""
+    title_lc: str
+    tokens: frozenset  # Word tokens of title_lc: keyword tests are hash probes, not substring scans
+    assets: int  # Bitmask of ASSET_* bits
+    strike: Optional[float]
+    is_updown: bool
+
+
+# Memoized per title (MarketEvent is slotted, so nothing can be cached on the event itself):
+# each event is compared against every event on the other exchange, so without this the
+# lowercasing, substring scans and strike regex rerun O(N*M) times per cycle
+@lru_cache(maxsize=4096)
+def _fingerprint(title: str) -> TitleFingerprint:
+    t = title.lower()  # The only lower() per title; every extractor below takes this copy
+    tokens = frozenset(_TOKEN_SPLIT_RE.split(t))
+    # Whole words: "update"/"breakdown" no longer count as an "Up or Down" market
+    return TitleFingerprint(t, tokens, _extract_assets(t), _extract_strike(t), _UPDOWN_TOKENS <= tokens)
+
+
 class EventMatcher:
     """
     Core logic for determining if a Kalshi event and a Polymarket event
     refer to the EXACT same real-world outcome.
     """
     
+    MAX_RESOLUTION_DIFF = 60  # Seconds; resolution times further apart are never equivalent
+
     def __init__(self, time_tolerance_minutes: int = 5):
         self.time_tolerance = timedelta(minutes=time_tolerance_minutes)
 
+    @classmethod
+    def block_key(cls, ev: MarketEvent) -> int:
+        """
+        Blocking key for candidate generation: events can only be equivalent if their keys
+        differ by at most 1, so callers compare each event against keys k-1, k, k+1 only.
+        """
+        return int(ev.resolution_time.timestamp() // cls.MAX_RESOLUTION_DIFF)
+
     def are_equivalent(self, ev_a: MarketEvent, ev_b: MarketEvent) -> bool:
         """
         Determines equivalence based on:
@@ -26,20 +99,31 @@ class EventMatcher:
 
         # 1. Check Resolution Time
         # Kalshi using close_time vs Poly endDate. Strict 60s tolerance.
-        if abs((ev_a.resolution_time - ev_b.resolution_time).total_seconds()) > 60:
-            logger.debug(f"Time mismatch: {abs(ev_a.resolution_time - ev_b.resolution_time)}. Events: {ev_a.ticker} vs {ev_b.ticker}")
+        # Rejections here are the common case in the N*M loop: one datetime subtraction, and lazy
+        # %-style debug args so nothing is formatted unless DEBUG is on
+        time_diff = abs((ev_a.resolution_time - ev_b.resolution_time).total_seconds())
+        if time_diff > self.MAX_RESOLUTION_DIFF:
+            logger.debug("Time mismatch: %.0fs. Events: %s vs %s", time_diff, ev_a.ticker, ev_b.ticker)
             return False
 
-        t1 = ev_a.title.lower()
-        t2 = ev_b.title.lower()
+        fp_a = _fingerprint(ev_a.title)
+        fp_b = _fingerprint(ev_b.title)
+        t1 = fp_a.title_lc
+        t2 = fp_b.title_lc
         
         # 2. Heuristic for Crypto 15m Markets
         # Kalshi: "BTC price up in next 15 mins?"
         # Poly: "Bitcoin Up or Down - ..."
         
-        assets_a = self._extract_assets(t1)
-        assets_b = self._extract_assets(t2)
-        shared_asset = assets_a.intersection(assets_b)
+        assets_a = fp_a.assets
+        assets_b = fp_b.assets
+        shared_asset = assets_a & assets_b
+
+        # Asset Mismatch Check (Generic): one AND on precomputed masks, so it runs before the
+        # type/strike branches (and also stops BTC "Up or Down" matching ETH "Up or Down")
+        if assets_a and assets_b and not shared_asset:
+             logger.debug("Asset mismatch: %#05b vs %#05b", assets_a, assets_b)
+             return False
         
         # Check if 15m related keywords exist
         # 2a. Strike Price Validation (CRITICAL FIX)
@@ -47,8 +131,8 @@ class EventMatcher:
         # Poly: "Bitcoin Up or Down" (Delta Strike = Spot)
         
         # Check explicit "Up/Down" type match first
-        is_type_updown_a = "up" in t1 and "down" in t1
-        is_type_updown_b = "up" in t2 and "down" in t2
+        is_type_updown_a = fp_a.is_updown
+        is_type_updown_b = fp_b.is_updown
         
         if is_type_updown_a and is_type_updown_b:
              # Both are explicitly "Up or Down" markets.
@@ -57,76 +141,27 @@ class EventMatcher:
              logger.info(f"MATCH FOUND (Up/Down Type Match): {ev_a.ticker} <-> {ev_b.ticker}")
              return True
 
-        s1 = self._extract_strike(t1)
-        s2 = self._extract_strike(t2)
+        s1 = fp_a.strike
+        s2 = fp_b.strike
         
         # If both have strikes, check equality
         if s1 and s2:
             if abs(s1 - s2) > 10: # $10 tolerance
-                logger.debug(f"Strike mismatch: {s1} vs {s2}")
+                logger.debug("Strike mismatch: %s vs %s", s1, s2)
                 return False
         
         # If one has strike and other says "Up or Down" (no specific strike mentioned), REJECT.
         # But wait, if we reached here, they AREN'T both Up/Down. 
         # So one is Fixed Strike, one is... something else (maybe Delta).
         if (s1 and not s2) or (s2 and not s1):
-            logger.debug(f"Market Type Mismatch (Fixed Strike vs Delta): {t1} ({s1}) vs {t2} ({s2})")
+            logger.debug("Market Type Mismatch (Fixed Strike vs Delta): %s (%s) vs %s (%s)", t1, s1, t2, s2)
             return False
         
-        # 3. Asset Mismatch Check (Generic) - MOVED BEFORE RETURN
-        if assets_a and assets_b and not shared_asset:
-             logger.debug(f"Asset mismatch: {assets_a} vs {assets_b}")
-             return False
-            
         # If timestamps match (checked above) and both share an asset (BTC/ETH/SOL) + 15m keywords
-        asset_str = next(iter(shared_asset)).upper() if shared_asset else "UNK"
+        asset_str = _ASSET_NAMES[shared_asset & -shared_asset].upper() if shared_asset else "UNK"  # Lowest set bit
         logger.info(f"MATCH FOUND ({asset_str} 15m heuristic): {ev_a.ticker} <-> {ev_b.ticker}")
         return True
 
-    def _extract_strike(self, title: str) -> Optional[float]:
-        try:
-            import re
-            # Look for patterns like $99,750, 99.75k? No, usually just numbers in Kalshi.
-            # Pattern: "above <number>" or "$<number>"
-            # Regex for dollar amount with commas
-            matches = re.findall(r'(?:above|below|>|<)?\s?\$?([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]+)?)', title)
-            if matches:
-                 # Filter out small numbers implies 15 mins? 
-                 # We want large numbers (price). E.g. > 1000.
-                 for m in matches:
-                     val = float(m.replace(',', ''))
-                     if val > 500: # BTC/ETH prices usually > 500
-                         return val
-        except:
-            pass
-        return None
-
-        # 4. Source Check (Critical for value parity)
-        if ev_a.source and ev_b.source:
-             if not self._sources_compatible(ev_a.source, ev_b.source):
-                 logger.debug(f"Source mismatch: {ev_a.source} vs {ev_b.source}")
-                 return False
-
-        # 5. Semantic Similarity (Simple fuzzy match for now, can be improved with NLP)
-        similarity = SequenceMatcher(None, t1, t2).ratio()
-        if similarity < 0.6: # Threshold needs tuning
-            logger.debug(f"Low similarity ({similarity:.2f}): '{ev_a.title}' vs '{ev_b.title}'")
-            return False
-            
-        logger.info(f"MATCH FOUND: {ev_a.ticker} <-> {ev_b.ticker} (Sim: {similarity:.2f})")
-        return True
-
-    def _extract_assets(self, text: str) -> set:
-        text = text.lower()
-        assets = set()
-        if "bitcoin" in text or "btc" in text:
-            assets.add("btc")
-        if "ethereum" in text or "eth" in text:
-            assets.add("eth")
-        if "solana" in text or "sol" in text:
-            assets.add("sol")
-        return assets
-        
     def _sources_compatible(self, source_a: str, source_b: str) -> bool:
         """
         Returns True if sources are likely the same.
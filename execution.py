@@ -1,4 +1,4 @@
-from config_manager import config
+from config_manager import SIMULATION_MODE
 from risk_manager import RiskManager
 from simulator import Simulator
 from logger import logger
@@ -98,7 +98,7 @@ class ExecutionCoordinator:
 
         logger.info(f"Attempting execution for {opp.type} Arb...")
 
-        if config.is_simulation():
+        if SIMULATION_MODE:
             self._execute_sim(opp, trade_size)
         else:
             await self._execute_real(opp, trade_size)
@@ -3,13 +3,15 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict
 from abc import ABC, abstractmethod
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import base64
 from logger import logger
 import asyncio
 import aiohttp
 
-@dataclass
+@dataclass(slots=True)
 class MarketEvent:
     exchange: str  # 'KALSHI' or 'POLYMARKET'
     event_id: str
@@ -28,6 +30,19 @@ class MarketEvent:
     def spread(self) -> float:
         return 1.0 - (self.yes_price + self.no_price)
 
+def _make_http_session() -> requests.Session:
+    """
+    Pooled requests.Session for a feed's sync REST calls: keep-alive sockets and TLS sessions
+    are reused instead of a fresh TCP+TLS handshake per requests.get().
+    Retries cover failed connects (request never sent) and read errors on idempotent methods only,
+    so an order POST that reached the exchange is never re-sent.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                          max_retries=Retry(total=3, backoff_factor=0.2))
+    session.mount("https://", adapter)
+    return session
+
 class MarketDataFeed(ABC):
     """Abstract base class for market data feeds."""
     @abstractmethod
@@ -62,6 +77,8 @@ class PolymarketFeed(MarketDataFeed):
 
         # OPT #3: Shared aiohttp session for async requests
         self._aiohttp_session = None
+        # Shared keep-alive session for the sync REST calls
+        self._http = _make_http_session()
 
     def fetch_events(self, limit: int = 100, tag_id: int = None, status: str = 'active', validate_tokens: bool = False) -> List[MarketEvent]:
         """
@@ -84,94 +101,131 @@ class PolymarketFeed(MarketDataFeed):
             params["tag_id"] = tag_id
 
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = self._http.get(url, params=params, timeout=10)
             resp.raise_for_status()
+            return self._parse_events(resp.json(), validate_tokens)
 
-            data = resp.json()
-
-            market_events = []
-            for item in data:
-                markets = item.get('markets', [])
-                if not markets:
-                    continue
-
-                mk = markets[0]
+        except Exception as e:
+            logger.error(f"Polymarket fetch failed: {e}")
+            return []
 
-                # Get token IDs
-                clob_ids = eval(mk.get('clobTokenIds', '[]'))
-                if not clob_ids or len(clob_ids) < 1:
-                    continue
+    async def fetch_events_async(self, limit: int = 100, tag_id: int = None, status: str = 'active', validate_tokens: bool = False) -> List[MarketEvent]:
+        """
+        OPT #3: Native aiohttp version of fetch_events (no executor thread per request).
+        Token validation, when requested, runs concurrently via get_orderbook_async.
+        """
+        url = f"{self.BASE_URL}/events"
+        params = {
+            "limit": limit,
+            "closed": "true" if status == 'closed' else "false",
+            "order": "endDate:asc"
+        }
+        if tag_id:
+            params["tag_id"] = tag_id
 
-                token_id = clob_ids[0]
+        try:
+            session = await self._get_aiohttp_session()
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
 
-                # OPTIMIZATION: Skip validation unless explicitly requested
-                if validate_tokens:
-                    if not self._validate_token(token_id):
-                        logger.debug(f"Skipping market with invalid token: {item.get('title', 'N/A')[:50]}")
-                        continue
-                
-                # Parse prices
-                try:
-                    outcomes = eval(mk.get('outcomePrices', '["0.5", "0.5"]'))
-                    yes_price = float(outcomes[0]) if len(outcomes) > 0 else 0.5
-                    no_price = float(outcomes[1]) if len(outcomes) > 1 else 0.5
-                except:
-                    yes_price = 0.5
-                    no_price = 0.5
-                
-                # Resolution time - CRITICAL FIX
-                # The 'endDate' field is WRONG - it's 15 minutes early!
-                # Use the timestamp from the slug (e.g., btc-updown-15m-1768341600)
-                # This timestamp represents the TRUE closing time
-                try:
-                    ticker = item.get('slug', '')
-                    if 'updown-15m' in ticker or '15m' in ticker:
-                        # Extract timestamp from end of slug
-                        parts = ticker.split('-')
-                        timestamp = int(parts[-1])
-                        # TIMEZONE FIX: Use utcfromtimestamp to get UTC time (matching Kalshi)
-                        # Unix timestamps are always UTC, so we need UTC conversion
-                        res_date = datetime.utcfromtimestamp(timestamp)
-                    else:
-                        # Fallback to endDate if not a 15m market
-                        res_date = datetime.fromisoformat(item.get('endDate', '').replace('Z', '+00:00'))
-                        res_date = res_date.replace(tzinfo=None)
-                except Exception as e:
-                    logger.warning(f"Failed to parse resolution time for {item.get('slug')}: {e}")
-                    res_date = datetime.now()
-                
-                # Outcome names
-                outcome_names = mk.get('outcomes') or ['Yes', 'No']
-                
-                me = MarketEvent(
-                    exchange="POLYMARKET",
-                    event_id=item.get('id'),
-                    ticker=item.get('slug', 'N/A'),
-                    title=item.get('title'),
-                    description=item.get('description', ''),
-                    resolution_time=res_date,
-                    yes_price=yes_price,
-                    no_price=no_price,
-                    volume=float(item.get('volume', 0)),
-                    source="Polymarket",
-                    winner=None,
-                    metadata={
-                        "clobTokenIds": clob_ids,
-                        "market_id": mk.get('id'),
-                        "outcomes": outcome_names
-                    }
+            market_events = self._parse_events(data, False)
+            if validate_tokens:
+                books = await asyncio.gather(
+                    *(self.get_orderbook_async(me.metadata["clobTokenIds"][0]) for me in market_events)
                 )
-                
-                market_events.append(me)
-
-            validation_msg = "tokens validated" if validate_tokens else "tokens NOT validated - will validate after matching"
-            logger.info(f"Fetched {len(market_events)} Polymarket markets ({validation_msg})")
+                market_events = [
+                    me for me, book in zip(market_events, books)
+                    if book.get('bids') or book.get('asks')
+                ]
             return market_events
-            
+
         except Exception as e:
-            logger.error(f"Polymarket fetch failed: {e}")
+            logger.error(f"[ASYNC] Polymarket fetch failed: {e}")
             return []
-    
+
+    def _parse_events(self, data: list, validate_tokens: bool) -> List[MarketEvent]:
+        """Build MarketEvents from a Gamma /events response (shared by sync and async fetch)."""
+        market_events = []
+        for item in data:
+            markets = item.get('markets', [])
+            if not markets:
+                continue
+
+            mk = markets[0]
+
+            # Get token IDs
+            clob_ids = eval(mk.get('clobTokenIds', '[]'))
+            if not clob_ids or len(clob_ids) < 1:
+                continue
+
+            token_id = clob_ids[0]
+
+            # OPTIMIZATION: Skip validation unless explicitly requested
+            if validate_tokens:
+                if not self._validate_token(token_id):
+                    logger.debug(f"Skipping market with invalid token: {item.get('title', 'N/A')[:50]}")
+                    continue
+            
+            # Parse prices
+            try:
+                outcomes = eval(mk.get('outcomePrices', '["0.5", "0.5"]'))
+                yes_price = float(outcomes[0]) if len(outcomes) > 0 else 0.5
+                no_price = float(outcomes[1]) if len(outcomes) > 1 else 0.5
+            except:
+                yes_price = 0.5
+                no_price = 0.5
+            
+            # Resolution time - CRITICAL FIX
+            # The 'endDate' field is WRONG - it's 15 minutes early!
+            # Use the timestamp from the slug (e.g., btc-updown-15m-1768341600)
+            # This timestamp represents the TRUE closing time
+            try:
+                ticker = item.get('slug', '')
+                if 'updown-15m' in ticker or '15m' in ticker:
+                    # Extract timestamp from end of slug
+                    parts = ticker.split('-')
+                    timestamp = int(parts[-1])
+                    # TIMEZONE FIX: Use utcfromtimestamp to get UTC time (matching Kalshi)
+                    # Unix timestamps are always UTC, so we need UTC conversion
+                    res_date = datetime.utcfromtimestamp(timestamp)
+                else:
+                    # Fallback to endDate if not a 15m market
+                    res_date = datetime.fromisoformat(item.get('endDate', '').replace('Z', '+00:00'))
+                    res_date = res_date.replace(tzinfo=None)
+            except Exception as e:
+                logger.warning(f"Failed to parse resolution time for {item.get('slug')}: {e}")
+                res_date = datetime.now()
+            
+            # Outcome names
+            outcome_names = mk.get('outcomes') or ['Yes', 'No']
+            
+            me = MarketEvent(
+                exchange="POLYMARKET",
+                event_id=item.get('id'),
+                ticker=item.get('slug', 'N/A'),
+                title=item.get('title'),
+                description=item.get('description', ''),
+                resolution_time=res_date,
+                yes_price=yes_price,
+                no_price=no_price,
+                volume=float(item.get('volume', 0)),
+                source="Polymarket",
+                winner=None,
+                metadata={
+                    "clobTokenIds": clob_ids,
+                    "market_id": mk.get('id'),
+                    "outcomes": outcome_names
+                }
+            )
+            
+            market_events.append(me)
+
+        validation_msg = "tokens validated" if validate_tokens else "tokens NOT validated - will validate after matching"
+        logger.info(f"Fetched {len(market_events)} Polymarket markets ({validation_msg})")
+        return market_events
+        
+
     def _validate_token(self, token_id: str) -> bool:
         """Quick validation to check if token exists in CLOB"""
         try:
@@ -187,7 +241,7 @@ class PolymarketFeed(MarketDataFeed):
         params = {"slug": slug}
         
         try:
-            resp = requests.get(url, params=params)
+            resp = self._http.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
             if not data: return None
@@ -271,7 +325,7 @@ class PolymarketFeed(MarketDataFeed):
         url = f"{self.CLOB_URL}/book"
         params = {"token_id": token_id}
         try:
-            resp = requests.get(url, params=params, timeout=5)
+            resp = self._http.get(url, params=params, timeout=5)
             resp.raise_for_status()
             return resp.json() or {}
         except Exception as e:
@@ -429,6 +483,8 @@ class KalshiFeed(MarketDataFeed):
 
         # OPT #3: Shared aiohttp session for async requests
         self._aiohttp_session = None
+        # Shared keep-alive session for the sync REST calls
+        self._http = _make_http_session()
 
     def load_private_key(self):
         try:
@@ -499,7 +555,7 @@ class KalshiFeed(MarketDataFeed):
         url = f"{self.BASE_URL}{path}"
         
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=5)
+            resp = self._http.post(url, headers=headers, json=payload, timeout=5)
             if resp.status_code != 201 and resp.status_code != 200:
                 logger.error(f"Kalshi Order Error ({resp.status_code}): {resp.text}")
                 return {"error": resp.text}
@@ -517,7 +573,7 @@ class KalshiFeed(MarketDataFeed):
         headers = self._get_headers("GET", full_path_for_sign)
         url = f"{self.BASE_URL}{path}"
         try:
-            resp = requests.get(url, headers=headers, timeout=5)
+            resp = self._http.get(url, headers=headers, timeout=5)
             if resp.status_code == 200:
                 return resp.json()
             else:
@@ -534,7 +590,7 @@ class KalshiFeed(MarketDataFeed):
         headers = self._get_headers("DELETE", full_path_for_sign)
         url = f"{self.BASE_URL}{path}"
         try:
-            resp = requests.delete(url, headers=headers, timeout=5)
+            resp = self._http.delete(url, headers=headers, timeout=5)
             if resp.status_code == 200:
                 logger.info(f"Order {order_id} cancelled successfully.")
                 return resp.json()
@@ -552,7 +608,7 @@ class KalshiFeed(MarketDataFeed):
         headers = self._get_headers("GET", full_path_for_sign)
         url = f"{self.BASE_URL}{path}"
         try:
-            resp = requests.get(url, headers=headers, timeout=5)
+            resp = self._http.get(url, headers=headers, timeout=5)
             if resp.status_code == 200:
                 data = resp.json()
                 # 'balance' is in cents
@@ -669,7 +725,7 @@ class KalshiFeed(MarketDataFeed):
         # We'll manually filter for tradeable markets (close_time in future) below
 
         try:
-            resp = requests.get(f"{self.BASE_URL}{path}", headers=headers, params=params)
+            resp = self._http.get(f"{self.BASE_URL}{path}", headers=headers, params=params)
             if resp.status_code != 200:
                 logger.error(f"Kalshi Fetch Error ({resp.status_code}): {resp.text}")
                 return []
@@ -677,84 +733,118 @@ class KalshiFeed(MarketDataFeed):
             data = resp.json()
             markets = data.get('markets', [])
             logger.info(f"Debug: Kalshi Raw Markets Fetched (all): {len(markets)}")
-            
-            market_events = []
-            for m in markets:
-                # Check for Crypto
-                # logger.debug(f"Checking title: {m.get('title')}")
-                # Keyword filter removed to allow broader market discovery
-                pass
-                
-                yes_bid = m.get('yes_bid', 0)
-                yes_ask = m.get('yes_ask', 0)
-                
-                # TAKER PRICING: We want to BUY at the ASK.
-                # If Ask is missing (0), use 0.99 (worst case) to avoid execution errors, 
-                # though it will be filtered by arb profitability anyway.
-                yes_price = yes_ask if yes_ask > 0 else 0.99
-                
-                # Normalize cents to dollars
-                if yes_price > 1.0: yes_price /= 100.0
-                if yes_bid > 1.0: valid_yes_bid = yes_bid / 100.0 
-                else: valid_yes_bid = yes_bid
-                
-                # No Price (Cost to Buy No) = 1.0 - Yes Bid (The price I can sell Yes at)
-                # Why? Because buying No is equivalent to Shorting Yes (Selling to the Bid).
-                # Cost_No = 1.00 - Price_Sold_Yes
-                no_price = 1.0 - valid_yes_bid
-                
-                # Use close_time (trading deadline) for matching, not expiration_time (settlement)
-                # This fixes the mismatch where settlement is days later.
-                try:
-                    time_str = m.get('close_time') or m.get('expiration_time')
-                    res_date = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-                    res_date = res_date.replace(tzinfo=None)
-                except:
-                    res_date = datetime.now()
-
-                # CRITICAL FIX: Skip markets where close_time has already passed
-                # Kalshi may return markets even after trading has closed (before settlement)
-                # TIMEZONE FIX: Use utcnow() since res_date is in UTC
-                if status == 'active':
-                    time_to_close = (res_date - datetime.utcnow()).total_seconds()
-                    if time_to_close < 0:
-                        logger.info(f"[FILTER] Skipping CLOSED market: {m.get('ticker')} (closed {-time_to_close:.0f}s ago, close_time={res_date})")
-                        continue
-
-                    # Skip markets closing more than 24 hours in the future (only get today's markets)
-                    if time_to_close > 86400:  # 24 hours
-                        logger.info(f"[FILTER] Skipping FUTURE market: {m.get('ticker')} (closes in {time_to_close/3600:.1f}h)")
-                        continue
-
-                    # DEBUG: Log markets that PASS the filter
-                    logger.info(f"[FILTER] ACCEPTED market: {m.get('ticker')} (closes in {time_to_close/60:.1f} min at {res_date})")
-
-                # Winner extraction for settled markets
-                winner = None
-                if status == 'closed' or m.get('result'):
-                     result = m.get('result') # 'yes', 'no', 'void'
-                     if result == 'yes': winner = 'Yes'
-                     elif result == 'no': winner = 'No'
-
-                me = MarketEvent(
-                    exchange="KALSHI",
-                    event_id=m.get('ticker'),
-                    ticker=m.get('ticker'),
-                    title=m.get('title'),
-                    description=m.get('subtitle', ''),
-                    resolution_time=res_date,
-                    yes_price=yes_price,
-                    no_price=1.0 - yes_price,
-                    volume=float(m.get('volume', 0)),
-                    source=m.get('settlement_source', 'Kalshi'),
-                    winner=winner
-                )
-                market_events.append(me)
-            return market_events
+            return self._parse_markets(markets, status)
+
         except Exception as e:
             logger.error(f"Kalshi fetch failed: {e}")
             return []
+
+    async def fetch_events_async(self, limit: int = 1000, series_ticker: str = None, status: str = 'active') -> List[MarketEvent]:
+        """
+        OPT #3: Native aiohttp version of fetch_events (no executor thread per request).
+        """
+        path = "/markets"
+        full_path_for_sign = "/trade-api/v2" + path
+        headers = self._get_headers("GET", full_path_for_sign)
+
+        params = {"limit": limit}
+        if series_ticker:
+            params["series_ticker"] = series_ticker
+
+        try:
+            session = await self._get_aiohttp_session()
+            async with session.get(f"{self.BASE_URL}{path}", headers=headers, params=params,
+                                   timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    logger.error(f"[ASYNC] Kalshi Fetch Error ({resp.status}): {text}")
+                    return []
+                data = await resp.json()
+
+            markets = data.get('markets', [])
+            logger.info(f"Debug: Kalshi Raw Markets Fetched (all): {len(markets)}")
+            return self._parse_markets(markets, status)
+
+        except Exception as e:
+            logger.error(f"[ASYNC] Kalshi fetch failed: {e}")
+            return []
+
+    def _parse_markets(self, markets: list, status: str) -> List[MarketEvent]:
+        """Build MarketEvents from a Kalshi /markets response (shared by sync and async fetch)."""
+        market_events = []
+        for m in markets:
+            # Check for Crypto
+            # logger.debug(f"Checking title: {m.get('title')}")
+            # Keyword filter removed to allow broader market discovery
+            pass
+            
+            yes_bid = m.get('yes_bid', 0)
+            yes_ask = m.get('yes_ask', 0)
             
+            # TAKER PRICING: We want to BUY at the ASK.
+            # If Ask is missing (0), use 0.99 (worst case) to avoid execution errors, 
+            # though it will be filtered by arb profitability anyway.
+            yes_price = yes_ask if yes_ask > 0 else 0.99
+            
+            # Normalize cents to dollars
+            if yes_price > 1.0: yes_price /= 100.0
+            if yes_bid > 1.0: valid_yes_bid = yes_bid / 100.0 
+            else: valid_yes_bid = yes_bid
+            
+            # No Price (Cost to Buy No) = 1.0 - Yes Bid (The price I can sell Yes at)
+            # Why? Because buying No is equivalent to Shorting Yes (Selling to the Bid).
+            # Cost_No = 1.00 - Price_Sold_Yes
+            no_price = 1.0 - valid_yes_bid
+            
+            # Use close_time (trading deadline) for matching, not expiration_time (settlement)
+            # This fixes the mismatch where settlement is days later.
+            try:
+                time_str = m.get('close_time') or m.get('expiration_time')
+                res_date = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+                res_date = res_date.replace(tzinfo=None)
+            except:
+                res_date = datetime.now()
+
+            # CRITICAL FIX: Skip markets where close_time has already passed
+            # Kalshi may return markets even after trading has closed (before settlement)
+            # TIMEZONE FIX: Use utcnow() since res_date is in UTC
+            if status == 'active':
+                time_to_close = (res_date - datetime.utcnow()).total_seconds()
+                if time_to_close < 0:
+                    logger.info(f"[FILTER] Skipping CLOSED market: {m.get('ticker')} (closed {-time_to_close:.0f}s ago, close_time={res_date})")
+                    continue
+
+                # Skip markets closing more than 24 hours in the future (only get today's markets)
+                if time_to_close > 86400:  # 24 hours
+                    logger.info(f"[FILTER] Skipping FUTURE market: {m.get('ticker')} (closes in {time_to_close/3600:.1f}h)")
+                    continue
+
+                # DEBUG: Log markets that PASS the filter
+                logger.info(f"[FILTER] ACCEPTED market: {m.get('ticker')} (closes in {time_to_close/60:.1f} min at {res_date})")
+
+            # Winner extraction for settled markets
+            winner = None
+            if status == 'closed' or m.get('result'):
+                 result = m.get('result') # 'yes', 'no', 'void'
+                 if result == 'yes': winner = 'Yes'
+                 elif result == 'no': winner = 'No'
+
+            me = MarketEvent(
+                exchange="KALSHI",
+                event_id=m.get('ticker'),
+                ticker=m.get('ticker'),
+                title=m.get('title'),
+                description=m.get('subtitle', ''),
+                resolution_time=res_date,
+                yes_price=yes_price,
+                no_price=1.0 - yes_price,
+                volume=float(m.get('volume', 0)),
+                source=m.get('settlement_source', 'Kalshi'),
+                winner=winner
+            )
+            market_events.append(me)
+        return market_events
+
     def get_orderbook(self, ticker: str) -> Dict:
         path = f"/markets/{ticker}/orderbook"
         # Correct path for signing: /trade-api/v2/markets/{ticker}/orderbook
@@ -763,7 +853,7 @@ class KalshiFeed(MarketDataFeed):
         
         url = f"{self.BASE_URL}{path}"
         try:
-            resp = requests.get(url, headers=headers)
+            resp = self._http.get(url, headers=headers)
             resp.raise_for_status()
             return resp.json().get('orderbook') or {}
         except Exception as e:
@@ -777,7 +867,7 @@ class KalshiFeed(MarketDataFeed):
         url = f"{self.BASE_URL}{path}"
         
         try:
-            resp = requests.get(url, headers=headers)
+            resp = self._http.get(url, headers=headers)
             if resp.status_code != 200:
                 return None
             
@@ -1,4 +1,4 @@
-from config_manager import config
+from config_manager import config, RISK
 from logger import logger
 from datetime import datetime, date
 import threading
@@ -24,7 +24,7 @@ class RiskManager:
 
         # Load Risk State from DB
         from database_manager import DatabaseManager
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(fast_mode=config.db_fast_mode)
         state = self.db.load_risk_state()
 
         # Inject Feed Reference for Real Checks
@@ -72,7 +72,7 @@ class RiskManager:
         This is for TOTAL cost (both legs combined), not per leg.
         With 10% limit and $10.99 balance = $1.10 max total trade.
         """
-        calc_risk = self.bankroll * config.risk_config.max_risk_per_trade
+        calc_risk = self.bankroll * RISK.max_risk_per_trade
         return calc_risk
 
     def check_daily_reset(self):
@@ -105,20 +105,20 @@ class RiskManager:
                 return False
 
             # 1. Check Max Risk Per Trade
-            max_trade_size = self.bankroll * config.risk_config.max_risk_per_trade
+            max_trade_size = self.bankroll * RISK.max_risk_per_trade
             if trade_amount > max_trade_size:
                 logger.warning(f"RISK REJECT: Trade size ${trade_amount:.2f} exceeds limit ${max_trade_size:.2f}")
                 return False
 
             # 2. Check Daily Loss Limit
-            max_daily_loss = self.bankroll * config.risk_config.max_daily_loss
+            max_daily_loss = self.bankroll * RISK.max_daily_loss
             if self.daily_pnl < -max_daily_loss:
                 logger.critical(f"RISK REJECT: Daily loss limit hit ({self.daily_pnl:.2f} < -{max_daily_loss:.2f})")
                 self.trigger_kill_switch("Daily Loss Limit Hit")
                 return False
 
             # 3. Check Net Exposure
-            max_exposure = self.bankroll * config.risk_config.max_net_exposure
+            max_exposure = self.bankroll * RISK.max_net_exposure
             if (self.current_exposure + trade_amount) > max_exposure:
                 logger.warning(f"RISK REJECT: Max exposure limit reached (Current: ${self.current_exposure:.2f} + Trade: ${trade_amount:.2f} = ${self.current_exposure + trade_amount:.2f} > Limit: ${max_exposure:.2f})")
                 return False
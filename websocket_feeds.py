@@ -61,7 +61,7 @@ class OrderbookCache:
         age_ms = (time.time() - last_update_time) * 1000
 
         if age_ms > self.MAX_AGE_MS:
-            logger.debug(f"[CACHE] Kalshi {ticker} data STALE ({age_ms:.0f}ms old)")
+            logger.debug("[CACHE] Kalshi %s data STALE (%.0fms old)", ticker, age_ms)
             return None
 
         return self.kalshi_orderbooks.get(ticker)
@@ -76,7 +76,7 @@ class OrderbookCache:
         age_ms = (time.time() - last_update_time) * 1000
 
         if age_ms > self.MAX_AGE_MS:
-            logger.debug(f"[CACHE] Poly {token_id[:16]}... data STALE ({age_ms:.0f}ms old)")
+            logger.debug("[CACHE] Poly %.16s... data STALE (%.0fms old)", token_id, age_ms)
             return None
 
         return self.poly_orderbooks.get(token_id)
@@ -246,7 +246,7 @@ class KalshiWebSocket:
             if ticker and side and price is not None:
                 # Update cache (simplified - full impl would merge deltas)
                 await self.cache.update_kalshi(ticker, side, [[price, delta]])
-                logger.debug(f"Kalshi delta: {ticker} {side} @ {price} Δ{delta}")
+                logger.debug("Kalshi delta: %s %s @ %s Δ%s", ticker, side, price, delta)
 
                 if self.on_update:
                     await self.on_update("kalshi", ticker)
@@ -338,14 +338,21 @@ class PolymarketWebSocket:
         # Polymarket requires subscribing to all tokens in a single message
         if token_ids:
             # Filter out already subscribed tokens AND validate new ones
+            candidates = [tid for tid in dict.fromkeys(token_ids) if tid not in self.subscribed_tokens]
+
+            # Validate before subscribing - independent HTTP checks, run concurrently off the
+            # event loop (wall-clock ~ slowest check instead of the sum)
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(None, self._validate_token_sync, tid) for tid in candidates)
+            )
+
             new_tokens = []
-            for tid in token_ids:
-                if tid not in self.subscribed_tokens:
-                    # Validate before subscribing
-                    if self._validate_token_sync(tid):
-                        new_tokens.append(tid)
-                    else:
-                        logger.info(f"Skipping invalid token: {tid[:20]}...")
+            for tid, valid in zip(candidates, results):
+                if valid:
+                    new_tokens.append(tid)
+                else:
+                    logger.info(f"Skipping invalid token: {tid[:20]}...")
 
             if new_tokens:
                 # Correct Polymarket subscription format
@@ -368,7 +375,8 @@ class PolymarketWebSocket:
             async for message in self.ws:
                 try:
                     data = json.loads(message)
-                    logger.debug(f"Polymarket received: {str(data)[:200]}")
+                    if logger.isEnabledFor(logging.DEBUG):  # str(data) of a full book is not free
+                        logger.debug(f"Polymarket received: {str(data)[:200]}")
                     await self._handle_message(data)
                 except json.JSONDecodeError:
                     logger.warning(f"Polymarket: Invalid JSON: {message[:100]}")
@@ -424,7 +432,7 @@ class PolymarketWebSocket:
                 for change in price_changes:
                     asset_id = change.get("asset_id")
                     if asset_id:
-                        logger.debug(f"Polymarket price change: {asset_id[:20]}... price={change.get('price')}")
+                        logger.debug("Polymarket price change: %.20s... price=%s", asset_id, change.get('price'))
                         # Could trigger callback here if needed
     
     async def close(self):
@@ -448,9 +456,10 @@ class WebSocketManager:
         self.ticker_to_token: Dict[str, str] = {}  # Map Kalshi ticker to Poly token
         
     async def _on_orderbook_update(self, source: str, identifier: str):
-        """Called when any orderbook updates. Triggers arb check."""
+        """Called when any orderbook updates. Triggers arb check with the just-written book."""
         if self.arb_callback:
-            await self.arb_callback(source, identifier, self.cache)
+            books = self.cache.kalshi_orderbooks if source == 'kalshi' else self.cache.poly_orderbooks
+            await self.arb_callback(source, identifier, books.get(identifier), self.cache)
     
     async def start(self, kalshi_tickers: list, poly_tokens: list, ticker_token_map: dict):
         """Start WebSocket connections and subscriptions."""